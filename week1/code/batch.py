@@ -0,0 +1,163 @@
+"""
+Vectorized k-mer extraction and counting with NumPy.
+
+Reads are concatenated into one uint8 buffer per chunk, encoded through a
+lookup table, and every packed k-mer of the forward and reverse strand is
+built with k shifted slices of that buffer. Counting is a single
+np.unique pass. The order of first occurrence of every k-mer and edge is
+kept as well, so the result matches the serial DBG build node for node.
+"""
+from typing import Iterable, Iterator
+
+import numpy as np
+
+from kmer import BASES, MAX_K
+
+# bases per chunk; bounds the size of the temporary arrays
+CHUNK_BASES = 1 << 22
+
+_TABLE = np.full(256, 4, dtype=np.uint8)
+for _i in range(4):
+    _TABLE[ord(BASES[_i])] = _i
+
+
+def _chunks(reads: Iterable[str], size: int) -> Iterator[list[str]]:
+    chunk: list[str] = []
+    bases = 0
+    for read in reads:
+        chunk.append(read)
+        bases += len(read)
+        if bases >= size:
+            yield chunk
+            chunk = []
+            bases = 0
+    if chunk:
+        yield chunk
+
+
+def _ranges(starts: np.ndarray, lengths: np.ndarray) -> np.ndarray:
+    """Concatenation of arange(start, start + length) for every pair, without a Python loop."""
+    ends = np.cumsum(lengths)
+    return np.arange(ends[-1] if len(ends) else 0, dtype=np.int64) + np.repeat(starts - (ends - lengths), lengths)
+
+
+def encode_reads(reads: list[str]) -> tuple[np.ndarray, np.ndarray]:
+    """Base codes 0-3 of the concatenated reads, and the length of each read."""
+    lengths = np.array([len(read) for read in reads], dtype=np.int64)
+    # reads may be str or bytes-like views into a ReadBuffer
+    joined = ''.join(reads).encode('ascii') if isinstance(reads[0], str) else b''.join(reads)
+    codes = _TABLE[np.frombuffer(joined, dtype=np.uint8)]
+    if codes.size and codes.max() > 3:
+        raise ValueError("reads contain bases other than A, C, G, T")
+    return codes, lengths
+
+
+def kmer_calls(codes: np.ndarray, lengths: np.ndarray, k: int) -> tuple[np.ndarray, ...]:
+    """
+    The k-mer of every _add_node call and the edge of every _add_edge call
+    the serial build makes on these reads, in call order, with the buffer
+    window of each arc's forward k-mer (pos) and reverse k-mer (mirror).
+    Edges are keyed as (source << 2) | last base of the target, since the
+    target is the source shifted by one base.
+    """
+    # packed k-mer starting at every position of the buffer
+    windows = max(len(codes) - k + 1, 0)
+    fwd = np.zeros(windows, dtype=np.uint64)
+    rc = np.zeros(windows, dtype=np.uint64)
+    for j in range(k):
+        base = codes[j: j + windows].astype(np.uint64)
+        fwd = (fwd << np.uint64(2)) | base
+        rc |= (np.uint64(3) - base) << np.uint64(2 * j)
+
+    # arcs of each read: windows first .. last - 1 of that read
+    starts = np.cumsum(lengths) - lengths
+    arcs = np.maximum(lengths - k, 0)
+    pos = _ranges(starts, arcs)
+    # rev[i] of PackedDBG._build_packed is the reverse complement of window last - i
+    last = np.repeat(starts + lengths - k, arcs)
+    mirror = np.repeat(starts, arcs) + last - pos
+
+    # the serial build calls _add_node on x_i, x_i+1, rev_i, rev_i+1 for each arc
+    calls = np.stack((fwd[pos], fwd[pos + 1], rc[mirror], rc[mirror - 1]), axis=1).ravel()
+    arc_calls = np.stack(((fwd[pos] << np.uint64(2)) | (fwd[pos + 1] & np.uint64(3)),
+                          (rc[mirror] << np.uint64(2)) | (rc[mirror - 1] & np.uint64(3))), axis=1).ravel()
+    return pos, mirror, calls, arc_calls
+
+
+def _count_chunk(reads: list[str], k: int) -> tuple[np.ndarray, ...]:
+    """Unique k-mers and edges of a chunk, with their counts and first position in the serial call order."""
+    _, _, calls, arc_calls = kmer_calls(*encode_reads(reads), k)
+    kmers, first, counts = np.unique(calls, return_index=True, return_counts=True)
+    edges, edge_first = np.unique(arc_calls, return_index=True)
+    return kmers, counts, first, len(calls), edges, edge_first, len(arc_calls)
+
+
+def count_chunks(reads: Iterable[str], k: int, chunk_bases: int = CHUNK_BASES) -> list[tuple[np.ndarray, ...]]:
+    """Per-chunk counts of the reads, for merge_counts."""
+    return [_count_chunk(chunk, k) for chunk in _chunks(reads, chunk_bases)]
+
+
+def count_kmers(reads: Iterable[str], k: int, chunk_bases: int = CHUNK_BASES) -> tuple[np.ndarray, ...]:
+    """
+    Count packed k-mers and edges of both strands, as PackedDBG._build_packed does.
+
+    Returns k-mers by node id, their counts, and the source and target ids of
+    every edge, in the order the serial build would have added them.
+    """
+    assert k < MAX_K  # the edge key needs 2k + 2 bits
+    return merge_counts(count_chunks(reads, k, chunk_bases), k)
+
+
+def merge_counts(parts: list[tuple[np.ndarray, ...]], k: int) -> tuple[np.ndarray, ...]:
+    """Combine the counts of consecutive chunks, given in read order, into the result of count_kmers."""
+    kmer_parts, count_parts, first_parts, edge_parts, edge_first_parts = [], [], [], [], []
+    calls_seen = 0
+    arcs_seen = 0
+    for kmers, counts, first, calls, edges, edge_first, arc_calls in parts:
+        kmer_parts.append(kmers)
+        count_parts.append(counts)
+        first_parts.append(first + calls_seen)
+        edge_parts.append(edges)
+        edge_first_parts.append(edge_first + arcs_seen)
+        calls_seen += calls
+        arcs_seen += arc_calls
+
+    def merge(keys, firsts, counts=None):
+        keys = np.concatenate(keys) if keys else np.zeros(0, dtype=np.uint64)
+        firsts = np.concatenate(firsts) if firsts else np.zeros(0, dtype=np.int64)
+        unique, inverse = np.unique(keys, return_inverse=True)
+        first = np.full(len(unique), np.iinfo(np.int64).max, dtype=np.int64)
+        np.minimum.at(first, inverse, firsts)
+        total = None
+        if counts is not None:
+            total = np.bincount(inverse, weights=np.concatenate(counts), minlength=len(unique)).astype(np.int64)
+        return unique, first, total
+
+    kmers, first, counts = merge(kmer_parts, first_parts, count_parts)
+    edges, edge_first, _ = merge(edge_parts, edge_first_parts)
+
+    # node ids in order of first occurrence, as _add_node hands them out
+    order = np.argsort(first, kind='stable')
+    rank = np.empty(len(order), dtype=np.int64)
+    rank[order] = np.arange(len(order))
+
+    edges = edges[np.argsort(edge_first, kind='stable')]
+    mask = np.uint64((1 << (2 * k)) - 1)
+    src = edges >> np.uint64(2)
+    dst = ((src << np.uint64(2)) | (edges & np.uint64(3))) & mask
+    src_ids = rank[np.searchsorted(kmers, src)]
+    dst_ids = rank[np.searchsorted(kmers, dst)]
+    return kmers[order], counts[order], src_ids, dst_ids
+
+
+def build_batch(dbg, data_list: Iterable[str]):
+    """Fill a packed DBG from the vectorized counts instead of per-k-mer calls."""
+    fill(dbg, *count_kmers(data_list, dbg.k))
+
+
+def fill(dbg, kmers: np.ndarray, counts: np.ndarray, src: np.ndarray, dst: np.ndarray):
+    """Add the counted nodes and edges to a packed DBG, in node id order."""
+    for kmer, count in zip(kmers.tolist(), counts.tolist()):
+        dbg.nodes[dbg._add_node(kmer)].count = count
+    for idx1, idx2 in zip(src.tolist(), dst.tolist()):
+        dbg._add_edge(idx1, idx2)
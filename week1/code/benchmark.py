@@ -0,0 +1,221 @@
+"""
+Benchmark harness: build, traversal and extraction on the bundled datasets
+and on synthetic ones of growing size.
+
+Every build run happens in a freshly forked process. Its peak RSS would count
+the pages inherited from the parent, so a run reports how far its peak grew
+past the RSS it started with. Each case is repeated and summarised by the
+median of its throughputs and the largest peak RSS growth. Results are
+appended to a JSON history and compared with a stored baseline; the exit
+status is 1 when a throughput falls or the peak memory grows by more than
+the tolerance.
+The batch reverse complement is also timed against the per-base loop it
+replaced, on each bundled dataset.
+
+usage: benchmark.py [-r repeats] [-t tolerance] [-b baseline.json] [-H history.json]
+                    [-g genome_sizes] [-u] data_root
+"""
+from typing import Optional
+import getopt
+import json
+import multiprocessing
+import os
+import random
+import statistics
+import sys
+import time
+
+from packed import PackedDBG
+from profiler import Profiler, _rss_mb
+from revcomp import reverse_complement_batch
+from utils import map_data
+
+K = 25
+CONTIGS = 20
+REPEATS = 3
+TOLERANCE = 0.2
+DATASETS = ["data1", "data2", "data3", "data4"]
+# genome lengths of the synthetic cases
+GENOME_SIZES = [20000, 80000]
+
+# throughputs must not fall, memory must not grow
+_HIGHER_IS_BETTER = {'kmers_per_s': True, 'contigs_per_s': True, 'peak_mb': False}
+
+_READS: list[str] = []
+
+
+def synthetic_reads(genome_length: int, coverage: int = 20, read_length: int = 100, error_rate: float = 0.01,
+                    seed: int = 0) -> list[str]:
+    """Reads sampled uniformly from a random genome, with substitution errors."""
+    rng = random.Random(seed)
+    genome = ''.join(rng.choice('ACGT') for _ in range(genome_length))
+    reads: list[str] = []
+    for _ in range(genome_length * coverage // read_length):
+        start = rng.randrange(genome_length - read_length + 1)
+        read = list(genome[start: start + read_length])
+        for i in range(read_length):
+            if rng.random() < error_rate:
+                read[i] = rng.choice('ACGT'.replace(read[i], ''))
+        reads.append(''.join(read))
+    return reads
+
+
+def _run(task: tuple[int, int]) -> dict:
+    k, contigs = task
+    start_mb = _rss_mb()
+    profiler = Profiler()
+    dbg = PackedDBG(k, _READS, incremental=True, profiler=profiler)
+    kmers = dbg.kmer_count
+    found = 0
+    for _ in range(contigs):
+        if dbg.get_longest_contig() is None:
+            break
+        found += 1
+    totals = profiler.report()['phase_totals']
+    traversal = totals.get('longest_path', 0.0) + totals.get('reset', 0.0) + totals.get('delete_path', 0.0)
+    extraction = totals.get('concat_path', 0.0)
+    return {
+        'kmers': kmers,
+        'contigs': found,
+        'build_time': totals['build'],
+        'traversal_time': traversal,
+        'extraction_time': extraction,
+        'kmers_per_s': kmers / max(totals['build'], 1e-9),
+        'contigs_per_s': found / max(traversal + extraction, 1e-9),
+        'peak_mb': _rss_mb() - start_mb,
+    }
+
+
+def run_case(reads: list[str], k: int = K, repeats: int = REPEATS, contigs: int = CONTIGS) -> dict:
+    """Median throughputs and the largest peak RSS growth over `repeats` runs, each in a fresh process."""
+    global _READS
+    _READS = reads
+    try:
+        ctx = multiprocessing.get_context('fork')
+        with ctx.Pool(1, maxtasksperchild=1) as pool:
+            runs = pool.map(_run, [(k, contigs)] * repeats, chunksize=1)
+    finally:
+        _READS = []
+    summary: dict = {'repeats': repeats, 'reads': len(reads), 'kmers': runs[0]['kmers'],
+                     'contigs': runs[0]['contigs']}
+    for key in ['build_time', 'traversal_time', 'extraction_time', 'kmers_per_s', 'contigs_per_s']:
+        summary[key] = statistics.median(run[key] for run in runs)
+    summary['peak_mb'] = max(run['peak_mb'] for run in runs)
+    return summary
+
+
+def _loop_reverse_complement(key: str) -> str:
+    # the dict-per-call, base-by-base version reverse_complement_batch replaced
+    complement = {'A': 'T', 'T': 'A', 'G': 'C', 'C': 'G'}
+    key = list(key[::-1])
+    for i in range(len(key)):
+        key[i] = complement[key[i]]
+    return ''.join(key)
+
+
+def revcomp_case(reads: list, repeats: int = REPEATS) -> dict:
+    """Best-of-repeats bases per second of the per-base loop and of the batch reverse complement."""
+    text = [read if isinstance(read, str) else bytes(read).decode('ascii') for read in reads]
+    bases = sum(len(read) for read in text)
+    loop = batch = float('inf')
+    for _ in range(repeats):
+        start = time.perf_counter()
+        expected = [_loop_reverse_complement(read) for read in text]
+        loop = min(loop, time.perf_counter() - start)
+        start = time.perf_counter()
+        found = reverse_complement_batch(text)
+        batch = min(batch, time.perf_counter() - start)
+        assert found == expected
+    return {'bases': bases, 'loop_bases_per_s': bases / max(loop, 1e-9),
+            'batch_bases_per_s': bases / max(batch, 1e-9), 'speedup': loop / max(batch, 1e-9)}
+
+
+def compare(results: dict[str, dict], baseline: dict[str, dict], tolerance: float) -> list[str]:
+    """Regressions of results against the baseline, one message each."""
+    regressions: list[str] = []
+    for case, result in results.items():
+        if case not in baseline:
+            continue
+        for metric, higher_is_better in _HIGHER_IS_BETTER.items():
+            old = baseline[case][metric]
+            new = result[metric]
+            if higher_is_better and new < old * (1 - tolerance):
+                regressions.append(f"{case}: {metric} fell from {old:.1f} to {new:.1f}")
+            elif not higher_is_better and new > old * (1 + tolerance):
+                regressions.append(f"{case}: {metric} grew from {old:.1f} to {new:.1f}")
+    return regressions
+
+
+def _load(path: str) -> Optional[object]:
+    if not os.path.exists(path):
+        return None
+    with open(path) as f:
+        return json.load(f)
+
+
+def _save(path: str, value: object):
+    with open(path, 'w') as f:
+        json.dump(value, f, indent=1)
+
+
+def main():
+    opts, args = getopt.getopt(sys.argv[1:], 'r:t:b:H:g:u')
+    repeats = REPEATS
+    tolerance = TOLERANCE
+    baseline_path = 'benchmark_baseline.json'
+    history_path = 'benchmark_history.json'
+    genome_sizes = GENOME_SIZES
+    update = False
+    for opt, value in opts:
+        if opt == '-r':
+            repeats = int(value)
+        elif opt == '-t':
+            tolerance = float(value)
+        elif opt == '-b':
+            baseline_path = value
+        elif opt == '-H':
+            history_path = value
+        elif opt == '-g':
+            genome_sizes = [int(size) for size in value.split(',')] if value else []
+        elif opt == '-u':
+            # make this run the new baseline
+            update = True
+    data_root = args[0] if args else '../data'
+
+    results: dict[str, dict] = {}
+    revcomp: dict[str, dict] = {}
+    for name in DATASETS:
+        path = data_root + '/' + name
+        if os.path.isdir(path):
+            reads = list(map_data(path))
+            results[name] = run_case(reads, repeats=repeats)
+            revcomp[name] = revcomp_case(reads, repeats)
+    for size in genome_sizes:
+        results[f"synthetic{size}"] = run_case(synthetic_reads(size), repeats=repeats)
+
+    print("case    kmers/s    contigs/s    peak MB")
+    for case, result in results.items():
+        print(f"{case}    {result['kmers_per_s']:.0f}    {result['contigs_per_s']:.2f}    {result['peak_mb']:.0f}")
+    print("case    loop bases/s    batch bases/s    speedup (reverse complement)")
+    for case, result in revcomp.items():
+        print(f"{case}    {result['loop_bases_per_s']:.0f}    {result['batch_bases_per_s']:.0f}    "
+              f"{result['speedup']:.1f}x")
+
+    history = _load(history_path) or []
+    history.append({'time': time.strftime('%Y-%m-%dT%H:%M:%S'), 'k': K, 'results': results,
+                    'reverse_complement': revcomp})
+    _save(history_path, history)
+
+    baseline = _load(baseline_path)
+    if baseline is None or update:
+        _save(baseline_path, results)
+        return
+    regressions = compare(results, baseline, tolerance)
+    for message in regressions:
+        print(f"REGRESSION {message}")
+    if regressions:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
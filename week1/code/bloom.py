@@ -0,0 +1,60 @@
+import math
+from typing import Optional
+
+_MIX1 = 0x9E3779B97F4A7C15
+_MIX2 = 0xC2B2AE3D27D4EB4F
+_WORD = (1 << 64) - 1
+
+
+class BloomFilter:
+    """
+    Bit-array Bloom filter over packed k-mers.
+
+    Sized for `capacity` distinct keys at false-positive rate `error_rate`;
+    `max_bytes` caps the bit array, in which case the real rate is higher
+    than asked for. The hash positions come from double hashing of two
+    multiplicative hashes, so a key costs two multiplications however many
+    hash functions are used.
+    """
+    bits: bytearray
+    size: int
+    hashes: int
+
+    def __init__(self, capacity: int, error_rate: float = 0.01, max_bytes: Optional[int] = None):
+        assert capacity > 0 and 0 < error_rate < 1
+        size = int(-capacity * math.log(error_rate) / (math.log(2) ** 2)) + 1
+        if max_bytes is not None:
+            size = min(size, 8 * max_bytes)
+        self.size = size
+        self.hashes = max(1, round(size / capacity * math.log(2)))
+        self.bits = bytearray((size + 7) // 8)
+
+    def nbytes(self) -> int:
+        return len(self.bits)
+
+    def false_positive_rate(self, count: int) -> float:
+        """Expected false-positive rate after `count` distinct keys were added."""
+        return (1 - math.exp(-self.hashes * count / self.size)) ** self.hashes
+
+    def add(self, key: int) -> bool:
+        """Add key; returns whether it was (probably) there already."""
+        h1 = ((key * _MIX1) & _WORD) >> 1
+        h2 = ((key * _MIX2) & _WORD) | 1
+        seen = True
+        for i in range(self.hashes):
+            pos = (h1 + i * h2) % self.size
+            byte = pos >> 3
+            bit = 1 << (pos & 7)
+            if not self.bits[byte] & bit:
+                seen = False
+                self.bits[byte] |= bit
+        return seen
+
+    def __contains__(self, key: int) -> bool:
+        h1 = ((key * _MIX1) & _WORD) >> 1
+        h2 = ((key * _MIX2) & _WORD) | 1
+        for i in range(self.hashes):
+            pos = (h1 + i * h2) % self.size
+            if not self.bits[pos >> 3] & (1 << (pos & 7)):
+                return False
+        return True
@@ -0,0 +1,177 @@
+from typing import Iterable, Optional
+
+from packed import PackedDBG
+from kmer import BASES, decode, encode_read, reverse_complement_code
+
+
+class CanonicalDBG(PackedDBG):
+    """
+    De Bruijn graph that stores each k-mer once, as min(kmer, rc(kmer)).
+
+    A node stands for both orientations of its k-mer. Each arc x -> y is kept at
+    x's node together with its twin rc(y) -> rc(x) at y's node, encoded as
+    (target_idx << 2) | (source_strand << 1) | target_strand. Traversal runs over
+    oriented states (idx << 1) | strand, so the reverse-complement copy of the
+    graph is never built, yet the walk sees the same bidirected graph as the
+    two-strand DBG.
+    """
+    palindromes: set[int]
+    removed: bytearray
+    depth: list[int]
+    next_state: list[int]
+    visited: bytearray
+
+    def __init__(self, k, data_list):
+        self.palindromes = set()
+        self.removed = bytearray()
+        self.depth = []
+        self.next_state = []
+        self.visited = bytearray()
+        super().__init__(k, data_list)
+
+    def _build(self, data_list: Iterable[str]):
+        for original in data_list:
+            fwd, rev = encode_read(original, self.k)
+            n = len(fwd)
+            if n < 2:
+                continue
+            # rev is read back to front: rev[n - 1 - i] is the reverse complement of fwd[i].
+            # Inner k-mers end two arcs and are counted twice, as in the two-strand build.
+            states = [self._add_state(fwd[i], rev[n - 1 - i], 1 if i == 0 or i == n - 1 else 2)
+                      for i in range(n)]
+            for i in range(n - 1):
+                self._add_state_arc(states[i], states[i + 1])
+        self.removed = bytearray(2 * self.kmer_count)
+
+    def _add_state(self, code: int, rc: int, times: int = 1) -> int:
+        canon = code if code <= rc else rc
+        idx = self._add_node(canon)
+        if times > 1 or code == rc:
+            # a palindrome occurs on both strands at once, like in the two-strand build
+            self.nodes[idx].count += (2 * times if code == rc else times) - 1
+            if code == rc:
+                self.palindromes.add(idx)
+        return (idx << 1) | (code != canon)
+
+    def _rc_state(self, sid: int) -> int:
+        if (sid >> 1) in self.palindromes:
+            return sid
+        return sid ^ 1
+
+    def _add_state_arc(self, sid1: int, sid2: int):
+        self._link(sid1, sid2)
+        # the twin rc(y) -> rc(x) leaves from y's node
+        self._link(self._rc_state(sid2), self._rc_state(sid1))
+
+    def _link(self, sid1: int, sid2: int):
+        self.nodes[sid1 >> 1].add_child(((sid2 >> 1) << 2) | ((sid1 & 1) << 1) | (sid2 & 1))
+
+    def _add_arc(self, kmer1: int, kmer2: int):
+        sid1 = self._add_state(kmer1, reverse_complement_code(kmer1, self.k))
+        sid2 = self._add_state(kmer2, reverse_complement_code(kmer2, self.k))
+        self._add_state_arc(sid1, sid2)
+
+    def _state_count(self, sid: int) -> int:
+        return self.nodes[sid >> 1].count
+
+    def _get_state_children(self, sid: int) -> list[int]:
+        strand = sid & 1
+        children: list[int] = []
+        for edge in self.nodes[sid >> 1].children:
+            if (edge >> 1) & 1 == strand:
+                target = ((edge >> 2) << 1) | (edge & 1)
+                if not self.removed[target]:
+                    children.append(target)
+        return children
+
+    def _get_sorted_children(self, sid):
+        children = self._get_state_children(sid)
+        # ties in count go to the lowest state, as DBG breaks them by id
+        children.sort(key=lambda sid: (-self._state_count(sid), sid))
+        return children
+
+    def _get_depth(self, start_sid: int) -> int:
+        """
+        Same iterative post-order walk as DBG._get_depth, over oriented states.
+        """
+        if self.visited[start_sid]:
+            return self.depth[start_sid]
+
+        stack: list[tuple[int, int]] = [(start_sid, 0)]
+        while stack:
+            sid, phase = stack.pop()
+            if phase == 0:
+                if self.visited[sid]:
+                    continue
+                self.visited[sid] = 1
+
+                children = self._get_sorted_children(sid)
+                if not children:
+                    self.depth[sid] = 1
+                    self.next_state[sid] = -1
+                    continue
+
+                stack.append((sid, 1))
+                for i in range(len(children) - 1, -1, -1):
+                    if not self.visited[children[i]]:
+                        stack.append((children[i], 0))
+            else:
+                max_depth = 0
+                max_child = -1
+                for child in self._get_sorted_children(sid):
+                    if self.depth[child] > max_depth:
+                        max_depth = self.depth[child]
+                        max_child = child
+                self.depth[sid] = max_depth + 1
+                self.next_state[sid] = max_child
+
+        return self.depth[start_sid]
+
+    def _reset(self):
+        size = 2 * self.kmer_count
+        self.depth = [0] * size
+        self.next_state = [-1] * size
+        self.visited = bytearray(size)
+
+    def _heap_traversal(self) -> bool:
+        return False
+
+    def _get_longest_path(self):
+        max_depth = 0
+        max_sid: Optional[int] = None
+        for idx in self.nodes.keys():
+            for sid in (idx << 1, (idx << 1) | 1):
+                if self.removed[sid] or (sid & 1 and idx in self.palindromes):
+                    continue
+                depth = self._get_depth(sid)
+                if depth > max_depth:
+                    max_depth = depth
+                    max_sid = sid
+
+        path: list[int] = []
+        sid = -1 if max_sid is None else max_sid
+        while sid != -1:
+            path.append(sid)
+            sid = self.next_state[sid]
+        return path
+
+    def _delete_path(self, path):
+        # only the walked orientation goes away, the twin stays for a later contig
+        for sid in path:
+            self.removed[sid] = 1
+            if self.removed[self._rc_state(sid)]:
+                del self.nodes[sid >> 1]
+
+    def _oriented_kmer(self, sid: int) -> int:
+        code = self.nodes[sid >> 1].kmer
+        if sid & 1:
+            return reverse_complement_code(code, self.k)
+        return code
+
+    def _concat_path(self, path):
+        if len(path) < 1:
+            return None
+        chars = [decode(self._oriented_kmer(path[0]), self.k)]
+        for i in range(1, len(path)):
+            chars.append(BASES[self._oriented_kmer(path[i]) & 3])
+        return ''.join(chars)
@@ -0,0 +1,170 @@
+"""
+CPython entry with every option: parallel build and traversal, Bloom
+filtering, spectrum cutoff, snapshots, k sweeps, profiling, the external
+build and the table graph.
+main.py is the default entry, written for Codon.
+"""
+from bloom import BloomFilter
+from dataset import get_n50
+from kmer import MAX_K
+from packed import PackedDBG
+from profiler import Profiler
+from revcomp import clean_reads
+from utils import data_files, map_data
+
+import getopt
+import sys
+import time
+
+USAGE = ("usage: cli.py [-j workers] [-b expected_kmers] [-c spectrum.json] [-s snapshot] [-k k1,k2,...]\n"
+         "              [-p report.json] [-m budget_mb] [-t] data_dir")
+
+
+def usage_error(message: str):
+    print(f"cli.py: {message}", file=sys.stderr)
+    print(USAGE, file=sys.stderr)
+    sys.exit(2)
+
+
+def check_options(opts: list[tuple[str, str]], args: list[str]):
+    """Reject argument lists the build cannot honour, before any read is parsed."""
+    if len(args) != 1:
+        usage_error("expected one data directory")
+    given = {opt for opt, _ in opts}
+    workers = 1
+    for opt, value in opts:
+        if opt == '-j':
+            workers = int(value) if value.isdigit() else 0
+            if workers < 1:
+                usage_error("-j takes a positive number of workers")
+        elif opt == '-k':
+            if not all(k.isdigit() and int(k) > 0 for k in value.split(',')):
+                usage_error("-k takes positive k values separated by commas")
+            # a packed k-mer fills at most one uint64
+            if any(int(k) > MAX_K for k in value.split(',')):
+                usage_error(f"-k takes k values up to {MAX_K}")
+        elif opt in ('-b', '-m') and not value.isdigit():
+            usage_error(f"{opt} takes a whole number")
+    sweep = any(opt == '-k' and ',' in value for opt, value in opts)
+    # the on-disk buckets and the snapshot's batch build need a spare bit pair
+    long_k = any(opt == '-k' and int(value) >= MAX_K for opt, value in opts if ',' not in value)
+    # pairs of options that cannot be combined, and why
+    conflicts = [
+        (sweep and bool(given & {'-b', '-c', '-s', '-p', '-m', '-t'}), "-b, -c, -s, -p, -m and -t take a single k"),
+        ('-b' in given and '-m' in given, "-b and -m cannot be combined"),
+        (long_k and bool(given & {'-m', '-s'}), f"-m and -s take k values up to {MAX_K - 1}"),
+        ('-s' in given and (workers > 1 or bool(given & {'-b', '-m'})), "-s builds its own graph (no -j, -b or -m)"),
+        ('-t' in given and (workers > 1 or bool(given & {'-b', '-c', '-s', '-m'})),
+         "-t builds its own graph (no -j, -b, -c, -s or -m)"),
+    ]
+    for conflict, message in conflicts:
+        if conflict:
+            usage_error(message)
+
+
+def main():
+    start_time = time.time()
+
+    try:
+        opts, args = getopt.getopt(sys.argv[1:], 'j:b:c:s:k:p:m:t')
+    except getopt.GetoptError as e:
+        usage_error(str(e))
+    check_options(opts, args)
+    workers = 1
+    ks = [25]
+    bloom = None
+    spectrum_path = ''
+    snapshot_path = ''
+    profile_path = ''
+    memory_budget = 0
+    table = False
+    for opt, value in opts:
+        if opt == '-j':
+            workers = int(value)
+        elif opt == '-b':
+            # keep k-mers seen only once out of the graph
+            bloom = BloomFilter(int(value), 0.01)
+        elif opt == '-c':
+            # cut k-mers below the spectrum valley, and write the spectrum there
+            spectrum_path = value
+        elif opt == '-s':
+            # reuse the graph saved there when the reads and k are unchanged
+            snapshot_path = value
+        elif opt == '-k':
+            # several values run a sweep, -j of them at a time, and keep the best N50
+            ks = [int(k) for k in value.split(',')]
+        elif opt == '-p':
+            # per-phase time, memory and counters as JSON
+            profile_path = value
+        elif opt == '-m':
+            # count k-mers in on-disk buckets, within this many MB of working memory
+            memory_budget = int(value) << 20
+        elif opt == '-t':
+            # keep the graph in an open-addressing k-mer table, the smallest in memory and slower to build
+            table = True
+    # reads are views into the memory-mapped read files, cut at ambiguous bases
+    data_list = clean_reads(map_data(args[0]), min(ks))
+    out_path = args[0] + '/' + 'contig.fasta'
+
+    if len(ks) > 1:
+        from sweep import best, sweep
+        results = sweep(data_list, ks, workers)
+        for result in results:
+            print(f"k={result['k']}    {result['time']:.2f}    {result['peak_mb']:.0f} MB    {result['n50']}")
+        chosen = best(results)
+        with open(out_path, 'w') as f:
+            for i in range(len(chosen['contigs'])):
+                f.write('>contig_'+ str(i) +'\n')
+                f.write(chosen['contigs'][i] + '\n')
+        total_time = time.time() - start_time
+        print(f"{total_time:.2f}    {chosen['n50']}    k={chosen['k']}")
+        return
+
+    k = ks[0]
+    profiler = Profiler() if profile_path else None
+    if snapshot_path:
+        # NumPy is only needed for this option
+        from csr import CSRDBG
+        from snapshot import load_snapshot, save_snapshot, snapshot_key
+        key = snapshot_key(data_files(args[0]), k)
+        dbg = load_snapshot(snapshot_path, key)
+        if dbg is None:
+            save_snapshot(CSRDBG(k, data_list), snapshot_path, key)
+            dbg = load_snapshot(snapshot_path, key)
+        dbg.profiler = profiler
+    elif table:
+        from table import TableDBG
+        dbg = TableDBG(k, data_list, incremental=True, profiler=profiler)
+    elif memory_budget:
+        # the arrays of a CSRDBG keep the finished graph within the budget as well
+        from csr import CSRDBG
+        dbg = CSRDBG(k, data_list, incremental=True, memory_budget=memory_budget, profiler=profiler)
+    else:
+        # -j counts in parallel too, unless -b picks a serial build; the count packs an edge in k + 1 bases
+        build_workers = workers if bloom is None and k < MAX_K else 1
+        dbg = PackedDBG(k=k, data_list=data_list, incremental=True, workers=build_workers, bloom=bloom,
+                  profiler=profiler)
+    if spectrum_path:
+        # NumPy is only needed for this option
+        from spectrum import apply_cutoff, export_json, graph_counts, histogram
+        hist = histogram(graph_counts(dbg))
+        export_json(hist, spectrum_path, k=k, cutoff=apply_cutoff(dbg))
+    ctg_info = []
+    with open(out_path, 'w') as f:
+        if workers > 1 and not (snapshot_path or memory_budget):
+            # independent components of a Node graph are traversed by -j processes
+            from components import get_top_contigs_parallel
+            contigs = get_top_contigs_parallel(dbg, 20, workers)
+        else:
+            contigs = dbg.get_top_contigs(20)
+        for i in range(len(contigs)):
+            f.write('>contig_'+ str(i) +'\n')
+            f.write(contigs[i] + '\n')
+            ctg_info.append(len(contigs[i]))
+    total_time = time.time() - start_time
+    if profiler is not None:
+        profiler.dump(profile_path)
+    print(f"{total_time:.2f}    {get_n50(ctg_info)}")
+
+if __name__ == "__main__":
+    main()
\ No newline at end of file
@@ -0,0 +1,166 @@
+"""
+Contig extraction in parallel over weakly connected components.
+
+Deleting a path never changes the depths in another component, so the
+sequence of contigs serial extraction takes from one component does not
+depend on the others. Each worker runs the incremental extraction on its
+components alone. The parent then merges the per-component sequences the
+way the serial heap would: at each step it takes the deepest head,
+breaking ties by the lowest start id.
+
+Most components can never reach the top n, so the workers share the n
+best keys found so far, where the key of a contig is the shortest contig
+its component has given up to and including it. The merge takes every
+contig whose key is at least the n-th best before any contig with a
+smaller key, so a component stops as soon as its next contig can no
+longer beat that: when its key has dropped below it, or when all the
+nodes it has left could not make a contig that long. Components are
+handed out largest first, so the threshold rises early and most small
+components are skipped without a traversal.
+"""
+from typing import Optional
+import copy
+import heapq
+import multiprocessing
+
+_GRAPH = None
+# the n best keys so far in ascending order, shared by the workers
+_BEST = None
+
+
+def weakly_connected_components(dbg) -> list[list[int]]:
+    """Node ids of each weakly connected component, by union-find over the edges, in node order."""
+    size = max(dbg.nodes.keys(), default=-1) + 1
+    parent = list(range(size))
+    rank = [0] * size
+
+    def find(x: int) -> int:
+        while parent[x] != x:
+            # path halving
+            parent[x] = parent[parent[x]]
+            x = parent[x]
+        return x
+
+    for idx, node in dbg.nodes.items():
+        for child in node.children:
+            a = find(idx)
+            b = find(child)
+            if a == b:
+                continue
+            if rank[a] < rank[b]:
+                a, b = b, a
+            parent[b] = a
+            if rank[a] == rank[b]:
+                rank[a] += 1
+
+    members: dict[int, list[int]] = {}
+    for idx in dbg.nodes.keys():
+        members.setdefault(find(idx), []).append(idx)
+    return list(members.values())
+
+
+def _threshold() -> int:
+    # the n-th best key so far; 0 until n contigs are known
+    return _BEST[0]
+
+
+def _offer(key: int):
+    """Insert a key into the shared n best, if it beats the n-th."""
+    with _BEST.get_lock():
+        if key <= _BEST[0]:
+            return
+        i = 0
+        while i + 1 < len(_BEST) and _BEST[i + 1] < key:
+            _BEST[i] = _BEST[i + 1]
+            i += 1
+        _BEST[i] = key
+
+
+def _extract(task: tuple[list[list[int]], int, int]) -> list[list[tuple[int, int, str]]]:
+    """
+    (length, start id, contig) of the contigs of each component that can
+    still make the top n, in extraction order.
+    """
+    components, n, min_length = task
+    # the first node of a contig brings k - 1 bases on top of the node lengths
+    overlap = _GRAPH.k - 1
+    results: list[list[tuple[int, int, str]]] = []
+    for component in components:
+        # the longest contig a component could still give
+        bound = sum(_GRAPH.nodes[idx].length for idx in component) + overlap
+        if bound < max(_threshold(), min_length):
+            results.append([])
+            continue
+        # the forked copy of the graph is private to this worker, so it can be consumed
+        sub = copy.copy(_GRAPH)
+        sub.nodes = {idx: _GRAPH.nodes[idx] for idx in component}
+        sub.incremental = True
+        sub.depth_heap = None
+        sub.stale = []
+        sub.dirty = []
+        sub.profiler = None
+        found: list[tuple[int, int, str]] = []
+        key = bound
+        while len(found) < n and min(key, bound) >= max(_threshold(), min_length):
+            path = sub._get_longest_path_incremental()
+            if not path:
+                break
+            contig = sub._concat_path(path)
+            found.append((len(contig), path[0], contig))
+            sub._delete_path(path)
+            key = min(key, len(contig))
+            bound -= len(contig) - overlap
+            _offer(key)
+        results.append(found)
+    return results
+
+
+def _chunks(components: list[list[int]], count: int) -> list[list[list[int]]]:
+    # largest first into the lightest chunk keeps the workers evenly loaded
+    chunks: list[list[list[int]]] = [[] for _ in range(count)]
+    load = [(0, i) for i in range(count)]
+    for component in sorted(components, key=len, reverse=True):
+        weight, i = heapq.heappop(load)
+        chunks[i].append(component)
+        heapq.heappush(load, (weight + len(component), i))
+    return [chunk for chunk in chunks if chunk]
+
+
+def get_top_contigs_parallel(dbg, n: int, workers: int, min_length: int = 0,
+                             components: Optional[list[list[int]]] = None) -> list[str]:
+    """
+    The contigs dbg.get_top_contigs(n, min_length) would return, with the
+    components spread over a pool of forked workers. The graph in the
+    parent is left untouched.
+    """
+    global _GRAPH, _BEST
+    if components is None:
+        components = weakly_connected_components(dbg)
+    if n < 1:
+        return []
+    ctx = multiprocessing.get_context('fork')
+    _GRAPH = dbg
+    _BEST = ctx.Array('q', n)
+    try:
+        with ctx.Pool(workers) as pool:
+            # a few chunks per worker, so one large component does not hold up the rest
+            chunked = _chunks(components, 4 * workers)
+            tasks = [(chunk, n, min_length) for chunk in chunked]
+            sequences = [seq for part in pool.map(_extract, tasks, chunksize=1) for seq in part]
+    finally:
+        _GRAPH = None
+        _BEST = None
+
+    # k-way merge on each component's next contig, as the serial heap picks them
+    heads = [(-seq[0][0], seq[0][1], i, 0) for i, seq in enumerate(sequences) if seq]
+    heapq.heapify(heads)
+    contigs: list[str] = []
+    while heads and len(contigs) < n:
+        _, _, i, pos = heapq.heappop(heads)
+        contig = sequences[i][pos][2]
+        if len(contig) < min_length:
+            break
+        contigs.append(contig)
+        if pos + 1 < len(sequences[i]):
+            heapq.heappush(heads, (-sequences[i][pos + 1][0], sequences[i][pos + 1][1], i, pos + 1))
+    return contigs
@@ -0,0 +1,208 @@
+from typing import Iterable, Optional
+
+import numpy as np
+
+from batch import count_kmers
+from external import count_external
+from flat import FlatTraversal
+from kmer import BASES, decode
+from packed import PackedDBG
+from parallel import count_parallel
+from profiler import Profiler
+
+
+def csr_layout(counts: np.ndarray, src: np.ndarray, dst: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+    """Offsets and targets of the edges src -> dst, each node's children sorted by count then id."""
+    src = src.astype(np.int32)
+    dst = dst.astype(np.int32)
+    order = np.lexsort((dst, -counts[dst].astype(np.int64), src))
+    offsets = np.zeros(len(counts) + 1, dtype=np.int64)
+    np.cumsum(np.bincount(src, minlength=len(counts)), out=offsets[1:])
+    return offsets, dst[order]
+
+
+def parent_layout(offsets: np.ndarray, targets: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+    """Offsets and parents of the reversed edges, each node's parents in id order."""
+    n = len(offsets) - 1
+    src = np.repeat(np.arange(n, dtype=np.int32), np.diff(offsets))
+    order = np.argsort(targets, kind='stable')
+    parent_offsets = np.zeros(n + 1, dtype=np.int64)
+    np.cumsum(np.bincount(targets, minlength=n), out=parent_offsets[1:])
+    return parent_offsets, src[order]
+
+
+class CSRDBG(FlatTraversal, PackedDBG):
+    """
+    De Bruijn graph kept in flat NumPy arrays indexed by node id instead of
+    Node objects.
+
+    k-mers are counted by the vectorized batch pass, over a pool of forked
+    processes when workers > 1 or through on-disk buckets when a
+    memory_budget is given; the adjacency is then
+    frozen into CSR form, where the children of node i are
+    targets[offsets[i]:offsets[i + 1]], already sorted by count, and its
+    parents are parents[parent_offsets[i]:parent_offsets[i + 1]]. Deleting a
+    path only clears alive flags, so the CSR arrays never change after the
+    build. get_top_contigs keeps depths between contigs as FlatTraversal
+    does; incremental does the same for get_longest_contig.
+    """
+    kmers: np.ndarray
+    counts: np.ndarray
+    offsets: np.ndarray
+    targets: np.ndarray
+    parent_offsets: np.ndarray
+    parents: np.ndarray
+    alive: np.ndarray
+    visited: np.ndarray
+    depth: np.ndarray
+    max_depth_child: np.ndarray
+    views: dict[str, memoryview]
+    arrays: Optional[tuple[np.ndarray, ...]]
+
+    def __init__(self, k, data_list, incremental: bool = False, workers: int = 1, memory_budget: int = 0,
+                 profiler: Optional[Profiler] = None, arrays: Optional[tuple[np.ndarray, ...]] = None):
+        # (kmers, counts, offsets, targets, parent_offsets, parents) already laid out,
+        # e.g. memory-mapped from a snapshot; without the last two the parents are laid out here
+        self.arrays = arrays
+        super().__init__(k, data_list, incremental=incremental, workers=workers, memory_budget=memory_budget,
+                         profiler=profiler)
+
+    def _check(self, data_list: Iterable[str]) -> Iterable[str]:
+        if self.arrays is not None:
+            return data_list
+        return super()._check(data_list)
+
+    def _build(self, data_list: Iterable[str]):
+        if self.arrays is not None:
+            self._attach(*self.arrays)
+            self.arrays = None
+            return
+        if self.workers > 1:
+            self._freeze(*count_parallel(data_list, self.k, self.workers))
+        elif self.memory_budget:
+            self._freeze(*count_external(data_list, self.k, self.memory_budget))
+        else:
+            self._freeze(*count_kmers(data_list, self.k))
+
+    def _freeze(self, kmers: np.ndarray, counts: np.ndarray, src: np.ndarray, dst: np.ndarray):
+        """Lay out the counted graph as CSR arrays, children sorted by count then id."""
+        counts = counts.astype(np.uint32)
+        offsets, targets = csr_layout(counts, src, dst)
+        self._attach(kmers.astype(np.uint64), counts, offsets, targets)
+
+    def _attach(self, kmers: np.ndarray, counts: np.ndarray, offsets: np.ndarray, targets: np.ndarray,
+                parent_offsets: Optional[np.ndarray] = None, parents: Optional[np.ndarray] = None):
+        # the graph arrays are only read from here on; the traversal state is private to this graph
+        n = len(kmers)
+        self.kmer_count = n
+        self.kmers = kmers
+        self.counts = counts
+        self.offsets = offsets
+        self.targets = targets
+        if parents is None:
+            parent_offsets, parents = parent_layout(offsets, targets)
+        self.parent_offsets = parent_offsets
+        self.parents = parents
+        self.alive = np.ones(n, dtype=np.bool_)
+        self.visited = np.zeros(n, dtype=np.bool_)
+        self.depth = np.zeros(n, dtype=np.int32)
+        self.max_depth_child = np.full(n, -1, dtype=np.int32)
+        # memoryviews index straight to Python ints, much cheaper than NumPy scalars in a loop
+        self.views = {name: memoryview(getattr(self, name)) for name in (
+            'offsets', 'targets', 'parent_offsets', 'parents', 'alive', 'visited', 'depth', 'max_depth_child')}
+
+    def nbytes(self) -> int:
+        return sum(arr.nbytes for arr in (self.kmers, self.counts, self.offsets, self.targets, self.parent_offsets,
+                                          self.parents, self.alive, self.visited, self.depth,
+                                          self.max_depth_child))
+
+    def _get_sorted_children(self, idx):
+        views = self.views
+        alive = views['alive']
+        offsets = views['offsets']
+        return [child for child in views['targets'][offsets[idx]:offsets[idx + 1]] if alive[child]]
+
+    def _get_parents(self, idx):
+        views = self.views
+        alive = views['alive']
+        offsets = views['parent_offsets']
+        return [parent for parent in views['parents'][offsets[idx]:offsets[idx + 1]] if alive[parent]]
+
+    def _get_depth(self, start_idx: int) -> int:
+        """
+        Same iterative post-order walk as DBG._get_depth, over the arrays.
+        """
+        views = self.views
+        visited = views['visited']
+        depth = views['depth']
+        if visited[start_idx]:
+            return depth[start_idx]
+
+        max_depth_child = views['max_depth_child']
+        alive = views['alive']
+        offsets = views['offsets']
+        targets = views['targets']
+        stack: list[tuple[int, int]] = [(start_idx, 0)]
+        while stack:
+            idx, phase = stack.pop()
+            if phase == 0:
+                if visited[idx]:
+                    continue
+                visited[idx] = True
+
+                children = [child for child in targets[offsets[idx]:offsets[idx + 1]] if alive[child]]
+                if not children:
+                    depth[idx] = 1
+                    max_depth_child[idx] = -1
+                    continue
+
+                stack.append((idx, 1))
+                for i in range(len(children) - 1, -1, -1):
+                    if not visited[children[i]]:
+                        stack.append((children[i], 0))
+                    elif not depth[children[i]]:
+                        # an edge back into the walk, as in DBG._get_depth
+                        self.loop_tails.append(idx)
+            else:
+                max_depth = 0
+                max_child = -1
+                for child in targets[offsets[idx]:offsets[idx + 1]]:
+                    if alive[child] and depth[child] > max_depth:
+                        max_depth = depth[child]
+                        max_child = child
+                depth[idx] = max_depth + 1
+                max_depth_child[idx] = max_child
+
+        return depth[start_idx]
+
+    def _reset(self):
+        self.visited.fill(False)
+        self.depth.fill(0)
+        self.max_depth_child.fill(-1)
+
+    def _get_longest_path(self):
+        visited = self.views['visited']
+        for idx in np.flatnonzero(self.alive).tolist():
+            if not visited[idx]:
+                self._get_depth(idx)
+
+        path: list[int] = []
+        max_idx = self._deepest()
+        while max_idx >= 0:
+            path.append(max_idx)
+            max_idx = int(self.max_depth_child[max_idx])
+        return path
+
+    def _deepest(self) -> int:
+        if not self.alive.any():
+            return -1
+        # argmax returns the first maximum, so ties go to the lowest id as in DBG
+        return int(np.argmax(np.where(self.alive, self.depth, 0)))
+
+    def _concat_path(self, path):
+        if len(path) < 1:
+            return None
+        chars = [decode(int(self.kmers[path[0]]), self.k)]
+        for i in range(1, len(path)):
+            chars.append(BASES[int(self.kmers[path[i]]) & 3])
+        return ''.join(chars)
@@ -0,0 +1,40 @@
+"""
+What both entries share about a dataset: the read files it holds, a plain
+reader for them and the N50 of the contigs. Plain Python only, since main.py
+compiles it with Codon; utils.py streams the same files under CPython.
+"""
+
+# read files of a dataset, in the order read_data streams them
+DATA_FILES = ["short_1.fasta", "short_2.fasta", "long.fasta"]
+
+
+def read_lines(path: str) -> list[str]:
+    """
+    Sequence lines of the plain FASTA files of a dataset, in the
+    one-line-per-record layout of the bundled datasets. utils.read_data
+    reads the rest under CPython.
+    """
+    lines: list[str] = []
+    for name in DATA_FILES:
+        f_loc = path + '/' + name
+        try:
+            with open(f_loc, 'r') as f:
+                for line in f:
+                    line = line.strip()
+                    if line and line[0] != '>':
+                        lines.append(line)
+        except Exception as e:
+            # a dataset may lack one of the files (data4 has no long reads)
+            print(f"Error reading {f_loc}: {e}")
+    return lines
+
+
+def get_n50(arr) -> int:
+    mid_pt = sum(arr) / 2
+    loc = 0
+    for ctg in arr:
+        curr = ctg
+        loc += curr
+        if loc >= mid_pt:
+            return curr
+    return 0
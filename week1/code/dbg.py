@@ -1,35 +1,56 @@
-from typing import Optional
+from typing import Iterable, Optional
 import copy
+import heapq
+import itertools
 
-def reverse_complement(key: str):
-    complement = {'A': 'T', 'T': 'A', 'G': 'C', 'C': 'G'}
+from revcomp import reverse_complement
+
+# The str graph of main.py, the entry meant for Codon. Packed k-mers and every
+# optional mode live in packed.PackedDBG, which only cli.py and the other
+# backends import, so each attribute here keeps one type on every path.
+
+
+class _NoPhase:
+    # what _phase hands out when nothing is profiled
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+
+_NO_PHASE = _NoPhase()
 
-    key = list(key[::-1])
-    for i in range(len(key)):
-        key[i] = complement[key[i]]
-    return ''.join(key)
 
 class Node:
+    # no per-instance __dict__: there is one Node per k-mer
+    __slots__ = ('kmer', 'children', 'parents', 'count', 'visited', 'depth', 'max_depth_child', 'length')
     kmer: str
     children: set[int]
+    parents: set[int]
     count: int
     visited: bool
     depth: int
     max_depth_child: Optional[int]
-    children_sorted : bool
+    length: int
 
     def __init__(self, kmer: str):
         self.kmer = kmer
         self.children = set()
+        self.parents = set()
         self.count = 0
+        # number of k-mers; above 1 once compaction has merged a chain into this node
+        self.length = 1
         self.visited = False
         self.depth = 0
         self.max_depth_child = None
-        self.children_sorted = False
 
     def add_child(self, kmer_idx: int) -> None:
         self.children.add(kmer_idx)
 
+    def add_parent(self, kmer_idx: int) -> None:
+        self.parents.add(kmer_idx)
+
     def increase(self) -> None:
         self.count += 1
 
@@ -48,38 +69,67 @@ class Node:
         self.children = set([itm for itm in self.children if itm not in target])
         # self.children = self.children - target
 
+    def remove_child(self, kmer_idx: int) -> None:
+        self.children.discard(kmer_idx)
+
+    def remove_parent(self, kmer_idx: int) -> None:
+        self.parents.discard(kmer_idx)
+
 
 class DBG:
     k: int
     nodes: dict[int, Node]
     kmer2idx: dict[str, int]
     kmer_count: int
-    def __init__(self, k, data_list):
+    incremental: bool
+    depth_heap: Optional[list[tuple[int, int]]]
+    stale: list[int]
+    dirty: list[int]
+    loop_tails: list[int]
+    reaches_cycle: set[int]
+    def __init__(self, k, data_list, incremental: bool = False, compact: bool = False):
         self.k = k
         self.nodes = {}
+        # keep depths between contigs and only redo the ancestors of deleted paths
+        self.incremental = incremental
         # private
         self.kmer2idx = {}
         self.kmer_count = 0
+        self.depth_heap = None
+        self.stale = []
+        self.dirty = []
+        self.loop_tails = []
+        self.reaches_cycle = set()
         # build
-        self._check(data_list)
-        self._build(data_list)
-
-    def _check(self, data_list: list[str]):
-        # check data list
+        data_list = self._check(data_list)
+        with self._phase('build'):
+            self._build(data_list)
+        self._after_build(compact)
+
+    def _check(self, data_list: Iterable[str]) -> Iterable[str]:
+        # check data list; reads may be a one-shot stream, so the first one is put back
+        reads = iter(data_list)
+        first = next(reads, None)
         try:
-            assert len(data_list) > 0
-            assert self.k <= len(data_list[0])
+            assert first is not None
+            assert self.k <= len(first)
         except Exception as e:
             print(f"Error in data_list or k: {e}")
             raise e
+        return itertools.chain([first], reads)
 
-    def _build(self, data_list: list[str]):
+    def _build(self, data_list: Iterable[str]):
         for original in data_list:
             rc = reverse_complement(original)
             for i in range(len(original) - self.k):
                 self._add_arc(original[i: i + self.k], original[i + 1: i + 1 + self.k])
                 self._add_arc(rc[i: i + self.k], rc[i + 1: i + 1 + self.k])
 
+    def _after_build(self, compact: bool):
+        if compact:
+            with self._phase('compact'):
+                self._compact()
+
     def _add_node(self, kmer: str) -> int:
         if kmer not in self.kmer2idx:
             self.kmer2idx[kmer] = self.kmer_count
@@ -92,14 +142,89 @@ class DBG:
     def _add_arc(self, kmer1: str, kmer2: str):
         idx1 = self._add_node(kmer1)
         idx2 = self._add_node(kmer2)
+        self._add_edge(idx1, idx2)
+
+    def _add_edge(self, idx1: int, idx2: int):
+        # predecessor links let _delete_path visit only the neighbours of a path
         self.nodes[idx1].add_child(idx2)
+        self.nodes[idx2].add_parent(idx1)
+
+    def _compact(self):
+        """
+        Collapse maximal non-branching chains into unitig nodes. A unitig keeps
+        the idx, count and parents of its first k-mer and the children of its
+        last one; kmer becomes the whole chain sequence and length its number
+        of k-mers.
+
+        A chain is also cut before any k-mer with a lower idx than the one
+        before it. The k-mer walk breaks a cycle where the scan in idx order
+        first enters it, and only such a k-mer can be that entry, so the
+        unitigs contain every cut the k-mer walk makes and give the same
+        contigs. Every cycle holds one, so no pure cycle is left over.
+        """
+        # a chain starts wherever it cannot extend backwards
+        for idx in list(self.nodes.keys()):
+            if idx not in self.nodes or self.nodes[idx].visited:
+                continue
+            node = self.nodes[idx]
+            if len(node.parents) == 1:
+                parent = next(iter(node.parents))
+                if parent < idx and len(self.nodes[parent].children) == 1:
+                    continue
+            self._merge_chain(idx)
+
+        # the compacted graph no longer has one node per k-mer
+        self.kmer2idx = {}
+        self._reset()
+
+    def _merge_chain(self, head_idx: int):
+        head = self.nodes[head_idx]
+        head.visited = True
+        tail_idx = head_idx
+        tail = head
+        chain: list[Node] = []
+        while len(tail.children) == 1:
+            next_idx = next(iter(tail.children))
+            next_node = self.nodes[next_idx]
+            if next_idx <= tail_idx or len(next_node.parents) != 1:
+                break
+            chain.append(next_node)
+            head.length += 1
+            del self.nodes[next_idx]
+            tail_idx = next_idx
+            tail = next_node
+
+        if tail is head:
+            return
+        head.kmer = self._chain_kmer(head.kmer, chain)
+        head.children = tail.children
+        for child in head.children:
+            child_node = self.nodes[child]
+            child_node.remove_parent(tail_idx)
+            child_node.add_parent(head_idx)
+
+    def _chain_kmer(self, kmer: str, chain: list[Node]) -> str:
+        # each next k-mer adds its last base
+        return kmer + ''.join([node.kmer[-1] for node in chain])
 
     def _get_count(self, child: int):
         return self.nodes[child].get_count()
 
+    def _get_children(self, idx) -> Iterable[int]:
+        # in no particular order, for walks that do not depend on it
+        return self.nodes[idx].children
+
+    def _get_parents(self, idx) -> Iterable[int]:
+        return self.nodes[idx].parents
+
+    def _get_links(self, idx) -> Iterable[int]:
+        node = self.nodes[idx]
+        return itertools.chain(node.parents, node.children)
+
     def _get_sorted_children(self, idx):
+        # ties in count go to the lowest id, not to set iteration order, which deletions can change
         children = self.nodes[idx].get_children()
-        children.sort(key=self._get_count, reverse=True)
+        children.sort(key=lambda child: (-self.nodes[child].count, child))
         return children
 
     def _get_depth(self, start_idx: int) -> int:
@@ -119,6 +244,10 @@ class DBG:
         # Single allocation for children lists - reuse for better memory performance
         temp_children: list[int] = []
 
+        # instrumentation stays in locals and is handed to _record_walk once per call
+        visits = 0
+        high = 1
+
         while stack:
             current_idx, phase = stack.pop()
             current_node = self.nodes[current_idx]
@@ -129,6 +258,7 @@ class DBG:
                     continue
 
                 current_node.visited = True
+                visits += 1
 
                 # Clear and reuse temp list instead of creating new ones
                 temp_children.clear()
@@ -136,12 +266,12 @@ class DBG:
 
                 if not temp_children:
                     # Leaf node - immediate computation
-                    current_node.depth = 1
+                    current_node.depth = current_node.length
                     current_node.max_depth_child = None
                     continue
 
-                # Sort in-place for memory efficiency
-                temp_children.sort(key=lambda child_idx: self.nodes[child_idx].count, reverse=True)
+                # Sort in-place for memory efficiency; equal counts go to the lowest id
+                temp_children.sort(key=lambda child_idx: (-self.nodes[child_idx].count, child_idx))
 
                 # Add back for post-processing
                 stack.append((current_idx, 1))
@@ -149,15 +279,21 @@ class DBG:
                 # Add children in reverse order, only unvisited ones
                 for i in range(len(temp_children) - 1, -1, -1):
                     child_idx = temp_children[i]
-                    if not self.nodes[child_idx].visited:
+                    child_node = self.nodes[child_idx]
+                    if not child_node.visited:
                         stack.append((child_idx, 0))
+                    elif not child_node.depth:
+                        # visited but unfinished: an edge back into the walk, so a cycle runs through here
+                        self.loop_tails.append(current_idx)
+                if len(stack) > high:
+                    high = len(stack)
 
             else:  # phase == 1
                 # Post-process: compute depth from children
                 # Reuse temp_children list
                 temp_children.clear()
                 temp_children.extend(current_node.children)
-                temp_children.sort(key=lambda child_idx: self.nodes[child_idx].count, reverse=True)
+                temp_children.sort(key=lambda child_idx: (-self.nodes[child_idx].count, child_idx))
 
                 max_depth = 0
                 max_child: Optional[int] = None
@@ -169,14 +305,16 @@ class DBG:
                         max_depth = child_depth
                         max_child = child_idx
 
-                current_node.depth = max_depth + 1
+                current_node.depth = max_depth + current_node.length
                 current_node.max_depth_child = max_child
 
+        self._record_walk(visits, high)
         return start_node.depth
 
     def _reset(self):
         for idx in self.nodes.keys():
             self.nodes[idx].reset()
+        self.loop_tails = []
 
     def _get_longest_path(self):
         """
@@ -208,24 +346,212 @@ class DBG:
 
         return path
 
+    def _get_longest_path_incremental(self):
+        """
+        Longest path from a heap of (-depth, idx) entries kept across calls.
+        Only nodes invalidated by the last _delete_path are recomputed: the
+        ancestors of the path, or its whole weakly connected component when
+        the path touched a cycle. Heap entries of deleted or recomputed
+        nodes are dropped lazily when they surface. Ties go to the lowest
+        idx, as in the full scan.
+        """
+        if self.depth_heap is None:
+            self._reset()
+            self.depth_heap = [(-self._get_depth(idx), idx) for idx in self.nodes.keys()]
+            heapq.heapify(self.depth_heap)
+            self._find_cycles()
+        else:
+            if self.dirty:
+                self._redo_components(self.dirty)
+            for idx in self.stale:
+                if idx in self.nodes:
+                    heapq.heappush(self.depth_heap, (-self._get_depth(idx), idx))
+            if len(self.depth_heap) > 2 * len(self.nodes):
+                # mostly outdated entries, which are cheaper to drop all at once than to pop
+                self.depth_heap = [(-self.nodes[idx].depth, idx) for idx in self.nodes.keys()]
+                heapq.heapify(self.depth_heap)
+        self.stale = []
+        self.dirty = []
+
+        heap = self.depth_heap
+        while heap:
+            depth, idx = heap[0]
+            if idx in self.nodes and self.nodes[idx].depth == -depth:
+                break
+            heapq.heappop(heap)
+
+        path: list[int] = []
+        max_idx: Optional[int] = heap[0][1] if heap else None
+        while max_idx is not None:
+            path.append(max_idx)
+            max_idx = self.nodes[max_idx].max_depth_child
+        return path
+
+    def _find_cycles(self):
+        """
+        Nodes from which a cycle can be reached, after a full pass. Every
+        cycle holds an edge the DFS found pointing back into its own walk,
+        and the tail of such an edge is on a cycle, so these are the
+        ancestors of those tails. Deleting nodes never adds to the set, so
+        it stays safe to use until the next full pass, and component
+        recomputes keep it as it is.
+        """
+        reaches = set(self.loop_tails)
+        self.loop_tails = []
+        todo = list(reaches)
+        while todo:
+            for parent in self._get_parents(todo.pop()):
+                if parent not in reaches:
+                    reaches.add(parent)
+                    todo.append(parent)
+        self.reaches_cycle = reaches
+
+    def _redo_components(self, seeds: list[int]):
+        """
+        Recompute the weakly connected components holding the seeds from
+        scratch. The DFS of a full pass never leaves a component, so
+        restarting it from the component's nodes in id order gives the
+        depths the full pass would, whatever happens elsewhere.
+        """
+        members = {idx for idx in seeds if idx in self.nodes}
+        todo = list(members)
+        while todo:
+            for other in self._get_links(todo.pop()):
+                if other not in members:
+                    members.add(other)
+                    todo.append(other)
+        order = sorted(members)
+        for idx in order:
+            self.nodes[idx].reset()
+        for idx in order:
+            heapq.heappush(self.depth_heap, (-self._get_depth(idx), idx))
+
+    def _invalidate(self, path, frontier: list[int], neighbours: list[int]):
+        """
+        Mark the nodes whose depth the deletion of path changed. The depths
+        around a cycle depend on where the DFS first entered it, which a
+        deletion upstream or downstream of the cycle can change, so in that
+        case the next call redoes the component the path was in, reached
+        from its neighbours, as the full scan would.
+        """
+        if any(idx in self.reaches_cycle for idx in path) or not self._invalidate_ancestors(frontier):
+            self.dirty.extend(neighbours)
+
     def _delete_path(self, path):
+        frontier: list[int] = []
+        neighbours: list[int] = []
+        edges = 0
         for idx in path:
-            del self.nodes[idx]
-        path_set = set(path)
-        for idx in self.nodes.keys():
-            self.nodes[idx].remove_children(path_set)
+            node = self.nodes.pop(idx)
+            for parent in node.parents:
+                if parent in self.nodes:
+                    self.nodes[parent].remove_child(idx)
+                    frontier.append(parent)
+                    edges += 1
+            for child in node.children:
+                if child in self.nodes:
+                    self.nodes[child].remove_parent(idx)
+                    neighbours.append(child)
+                    edges += 1
+        if self.depth_heap is not None:
+            self._invalidate(path, frontier, frontier + neighbours)
+        self._record_delete(len(path), edges)
+
+    def _invalidate_ancestors(self, frontier: list[int]) -> bool:
+        """Reset the ancestors of a deleted acyclic path; False if one of them reaches a cycle."""
+        while frontier:
+            idx = frontier.pop()
+            if idx not in self.nodes or not self.nodes[idx].visited:
+                continue
+            if idx in self.reaches_cycle:
+                return False
+            self.nodes[idx].reset()
+            self.stale.append(idx)
+            frontier.extend(self._get_parents(idx))
+        return True
 
     def _concat_path(self, path):
         if len(path) < 1:
             return None
+        # each next node overlaps the previous one by k - 1 bases
         concat = copy.copy(self.nodes[path[0]].kmer)
         for i in range(1, len(path)):
-            concat += self.nodes[path[i]].kmer[-1]
+            node = self.nodes[path[i]]
+            concat += node.kmer[-node.length:]
         return concat
 
-    def get_longest_contig(self):
-        self._reset()
-        path = self._get_longest_path()
-        contig = self._concat_path(path)
-        self._delete_path(path)
+    # Profiling hooks. The str graph records nothing and hands out the same
+    # no-op context every time; PackedDBG sends them to its profiler.
+    def _phase(self, name: str) -> _NoPhase:
+        return _NO_PHASE
+
+    def _record_walk(self, visits: int, high: int):
+        pass
+
+    def _record_delete(self, nodes: int, edges: int):
+        pass
+
+    def _record_contig(self, length: int, nodes: int):
+        pass
+
+    def _take_path(self, path):
+        with self._phase('concat_path'):
+            contig = self._concat_path(path)
+        with self._phase('delete_path'):
+            self._delete_path(path)
+        if contig is not None:
+            self._record_contig(len(contig), len(path))
         return contig
+
+    def _heap_traversal(self) -> bool:
+        # graphs that replace _get_longest_path return False, as the heap walks the dict nodes
+        return True
+
+    def _drop_heap(self):
+        self.depth_heap = None
+        self.stale = []
+        self.dirty = []
+
+    def get_longest_contig(self):
+        if self.incremental:
+            with self._phase('longest_path'):
+                path = self._get_longest_path_incremental()
+        else:
+            with self._phase('reset'):
+                self._reset()
+            with self._phase('longest_path'):
+                path = self._get_longest_path()
+        return self._take_path(path)
+
+    def get_top_contigs(self, n: int, min_length: int = 0) -> list[str]:
+        """
+        Up to n contigs, the same ones n calls of get_longest_contig give,
+        stopping early at the first one shorter than min_length (that one is
+        still removed from the graph). The depth DP runs once, filling a
+        max-heap of (depth, start node) candidates. Each contig is the path
+        from the deepest candidate still valid: entries of deleted nodes are
+        skipped when they surface, and a deletion only recomputes and
+        pushes again the ancestors of the path, or its component when the
+        path touched a cycle. Graphs that replace the traversal fall back to
+        repeated full passes.
+        """
+        contigs: list[str] = []
+        if not self._heap_traversal():
+            while len(contigs) < n:
+                contig = self.get_longest_contig()
+                if contig is None or len(contig) < min_length:
+                    break
+                contigs.append(contig)
+            return contigs
+
+        while len(contigs) < n:
+            with self._phase('longest_path'):
+                path = self._get_longest_path_incremental()
+            contig = self._take_path(path)
+            if contig is None or len(contig) < min_length:
+                break
+            contigs.append(contig)
+        if not self.incremental:
+            # get_longest_contig starts every call from a reset in this mode
+            self._drop_heap()
+        return contigs
@@ -0,0 +1,224 @@
+"""
+Disk-backed graph construction for PackedDBG and CSRDBG.
+
+Reads are streamed in chunks sized to the memory budget. Each chunk is
+counted with NumPy as in batch.py, and every distinct k-mer and arc of the
+chunk goes to the bucket file of its k-mer's minimizer as a (k-mer, first
+call, count) or (edge, first call) record, so consecutive k-mers of a read,
+and a k-mer and its reverse complement, land in the same bucket. Each
+bucket is then reduced on its own to one record per k-mer or edge; a
+bucket too large for the budget is first split again by k-mer hash. Splits
+never hold more than FAN_IN files open, so a small budget costs extra
+passes, not file descriptors.
+
+The reduced buckets are stitched into the arrays count_kmers returns: node
+ids in order of first call, counts, and the source and target ids of every
+edge. These take a few dozen bytes per k-mer, so a CSRDBG frozen from them
+stays within the budget as long as the compact graph does. A PackedDBG
+adds a Node per k-mer on top, as the batch build does.
+"""
+from typing import Iterable, Optional
+import os
+import tempfile
+
+import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
+
+from batch import _chunks, encode_reads, fill, kmer_calls
+from kmer import MAX_K, kmer_mask
+
+BUCKETS = 64
+# minimizer length; capped at k
+MINIMIZER_LEN = 11
+# bytes of temporary arrays per base of a chunk being counted and spilled
+BASE_BYTES = 400
+# bytes of temporary arrays per record of a bucket being reduced
+RECORD_BYTES = 64
+# fewest records read from a file at a time
+MIN_CHUNK = 256
+# most files open at once while splitting
+FAN_IN = 64
+
+_FIB = np.uint64(0x9E3779B97F4A7C15)
+
+
+def _mix(values: np.ndarray, level: int) -> np.ndarray:
+    # splitmix64 finalizer, seeded by level, so each round of splitting cuts a part along new lines
+    z = values + np.uint64(((level + 1) * 0x9E3779B97F4A7C15) & ((1 << 64) - 1))
+    z = (z ^ (z >> np.uint64(30))) * np.uint64(0xBF58476D1CE4E5B9)
+    z = (z ^ (z >> np.uint64(27))) * np.uint64(0x94D049BB133111EB)
+    return z ^ (z >> np.uint64(31))
+
+
+def _minimizers(codes: np.ndarray, k: int, m: int, buckets: int) -> np.ndarray:
+    """Bucket of the k-mer at every window of the buffer, as minimizer_buckets."""
+    n = max(len(codes) - m + 1, 0)
+    fwd = np.zeros(n, dtype=np.uint64)
+    rc = np.zeros(n, dtype=np.uint64)
+    for j in range(m):
+        base = codes[j: j + n].astype(np.uint64)
+        fwd = (fwd << np.uint64(2)) | base
+        rc |= (np.uint64(3) - base) << np.uint64(2 * j)
+    hashes = np.minimum(fwd * _FIB, rc * _FIB)
+    if n < k - m + 1:
+        return np.zeros(0, dtype=np.int64)
+    smallest = sliding_window_view(hashes, k - m + 1).min(axis=1)
+    return ((smallest >> np.uint64(32)) % np.uint64(buckets)).astype(np.int64)
+
+
+def minimizer_buckets(read: str, k: int, m: int, buckets: int) -> list[int]:
+    """
+    Bucket of each k-mer of a read: the smallest hash over its m-mers, taking
+    each m-mer as the smaller hash of its two strands, so the reverse
+    complement k-mer at the same position gets the same bucket.
+    """
+    codes, _ = encode_reads([read])
+    return _minimizers(codes, k, m, buckets).tolist()
+
+
+def _spill(records: np.ndarray, buckets: np.ndarray, paths: list[str]):
+    """Append each record to the file of its bucket."""
+    order = np.argsort(buckets, kind='stable')
+    bounds = np.searchsorted(buckets[order], np.arange(len(paths) + 1))
+    records = records[order]
+    for b in np.flatnonzero(np.diff(bounds)).tolist():
+        with open(paths[b], 'ab') as f:
+            records[bounds[b]: bounds[b + 1]].tofile(f)
+
+
+def _load(path: str, width: int, out: Optional[np.ndarray] = None) -> np.ndarray:
+    """Records of a file of 64-bit integers, width per record, read into out when given."""
+    if out is None:
+        out = np.empty((os.path.getsize(path) // (8 * width), width), dtype=np.uint64)
+    with open(path, 'rb') as f:
+        f.readinto(memoryview(out).cast('B'))
+    return out
+
+
+def _split(path: str, width: int, parts: int, chunk: int, level: int) -> list[str]:
+    """Spread the records of a file over `parts` files by hash of their first field."""
+    out = [path + f".{p}" for p in range(parts)]
+    files = [open(part, 'wb') for part in out]
+    try:
+        with open(path, 'rb') as f:
+            while True:
+                records = np.fromfile(f, dtype=np.uint64, count=chunk * width).reshape(-1, width)
+                if not len(records):
+                    break
+                dest = _mix(records[:, 0], level) % np.uint64(parts)
+                for p in range(parts):
+                    records[dest == p].tofile(files[p])
+    finally:
+        for f in files:
+            f.close()
+    os.remove(path)
+    return out
+
+
+def _reduce_file(path: str, width: int) -> str:
+    """One record per k-mer or edge: its first call, and for k-mers the summed count."""
+    records = _load(path, width)
+    os.remove(path)
+    records = records[np.lexsort((records[:, 1], records[:, 0]))]
+    starts = np.flatnonzero(np.r_[True, records[1:, 0] != records[:-1, 0]])
+    reduced = records[starts]
+    if width == 3:
+        reduced[:, 2] = np.add.reduceat(records[:, 2], starts)
+    out = path + '.reduced'
+    reduced.tofile(out)
+    return out
+
+
+def _reduce(path: str, width: int, budget: int, chunk: int, level: int = 0) -> list[str]:
+    """
+    Reduce a bucket file, first splitting it, at most FAN_IN ways per round,
+    while its records could outgrow half the budget.
+    """
+    if not os.path.exists(path):
+        return []
+    size = os.path.getsize(path)
+    if not size:
+        # a split can leave a part empty
+        os.remove(path)
+        return []
+    parts = min(-(-(size // (8 * width)) * RECORD_BYTES // (budget // 2)), FAN_IN)
+    if parts <= 1:
+        return [_reduce_file(path, width)]
+    out: list[str] = []
+    for part in _split(path, width, parts, chunk, level):
+        if os.path.getsize(part) == size:
+            # a single k-mer or edge cannot be split any further
+            out.append(_reduce_file(part, width))
+        else:
+            out += _reduce(part, width, budget, chunk, level + 1)
+    return out
+
+
+def _stitch(paths: list[str], width: int) -> np.ndarray:
+    """The reduced records of all buckets in order of first call, each file removed once read."""
+    sizes = [os.path.getsize(path) // (8 * width) for path in paths]
+    records = np.empty((sum(sizes), width), dtype=np.uint64)
+    start = 0
+    for path, size in zip(paths, sizes):
+        _load(path, width, records[start: start + size])
+        os.remove(path)
+        start += size
+    # first calls are unique, so this is the serial order
+    return records[np.argsort(records[:, 1])]
+
+
+def count_external(data_list: Iterable[str], k: int, memory_budget: int, buckets: int = BUCKETS,
+                   tmp_dir: Optional[str] = None) -> tuple[np.ndarray, ...]:
+    """count_kmers through on-disk buckets, within memory_budget bytes beyond the returned arrays."""
+    assert k < MAX_K  # the edge key needs 2k + 2 bits
+    m = min(MINIMIZER_LEN, k)
+    with tempfile.TemporaryDirectory(dir=tmp_dir) as directory:
+        node_paths = [os.path.join(directory, f"nodes{b}") for b in range(buckets)]
+        edge_paths = [os.path.join(directory, f"edges{b}") for b in range(buckets)]
+        calls_seen = 0
+        arcs_seen = 0
+        for chunk in _chunks(data_list, max(memory_budget // BASE_BYTES, 1)):
+            codes, lengths = encode_reads(chunk)
+            pos, mirror, calls, arc_calls = kmer_calls(codes, lengths, k)
+            bucket = _minimizers(codes, k, m, buckets)
+            del codes
+            # a k-mer shares its bucket with its reverse complement, and an edge goes with its source
+            call_buckets = np.stack((bucket[pos], bucket[pos + 1], bucket[mirror], bucket[mirror - 1]),
+                                    axis=1).ravel()
+            arc_buckets = np.stack((bucket[pos], bucket[mirror]), axis=1).ravel()
+            del pos, mirror, bucket
+            kmers, first, counts = np.unique(calls, return_index=True, return_counts=True)
+            _spill(np.stack((kmers, (first + calls_seen).astype(np.uint64), counts.astype(np.uint64)), axis=1),
+                   call_buckets[first], node_paths)
+            edges, edge_first = np.unique(arc_calls, return_index=True)
+            _spill(np.stack((edges, (edge_first + arcs_seen).astype(np.uint64)), axis=1),
+                   arc_buckets[edge_first], edge_paths)
+            calls_seen += len(calls)
+            arcs_seen += len(arc_calls)
+
+        # a quarter of the budget buffers the records being split
+        chunk = max(memory_budget // (4 * 8 * 3), MIN_CHUNK)
+        node_parts: list[str] = []
+        edge_parts: list[str] = []
+        for node_path, edge_path in zip(node_paths, edge_paths):
+            node_parts += _reduce(node_path, 3, memory_budget, chunk)
+            edge_parts += _reduce(edge_path, 2, memory_budget, chunk)
+
+        nodes = _stitch(node_parts, 3)
+        kmers = nodes[:, 0].copy()
+        counts = nodes[:, 2].astype(np.uint32)
+        del nodes
+        # node id of a k-mer, through the k-mers in value order
+        by_value = np.argsort(kmers).astype(np.int32)
+        sorted_kmers = kmers[by_value]
+        edges = _stitch(edge_parts, 2)[:, 0].copy()
+        # the child is the last k bases of the k + 1 bases of the edge
+        dst = by_value[np.searchsorted(sorted_kmers, edges & np.uint64(kmer_mask(k)))]
+        src = by_value[np.searchsorted(sorted_kmers, edges >> np.uint64(2))]
+    return kmers, counts, src, dst
+
+
+def build_external(dbg, data_list: Iterable[str], memory_budget: int, buckets: int = BUCKETS,
+                   tmp_dir: Optional[str] = None):
+    """Fill a packed DBG from counts taken through on-disk buckets."""
+    fill(dbg, *count_external(data_list, dbg.k, memory_budget, buckets, tmp_dir))
@@ -0,0 +1,132 @@
+"""
+Incremental longest path for graphs that keep their traversal state in
+flat arrays indexed by node id instead of Node objects.
+
+The invalidation is DBG's: deleting a path resets its ancestors, or marks
+its weakly connected component for a redo when the path touches a node
+that reaches a cycle, and the next call recomputes just those. There is no
+heap. A deleted node's depth is zeroed, so every live depth stays valid
+and the deepest live node is found by one scan of the depth array.
+"""
+from typing import Iterable
+import itertools
+
+
+class FlatTraversal:
+    """
+    Mixin for a DBG subclass with alive, visited, depth and max_depth_child
+    arrays (anything a memoryview can wrap) and kmer_count nodes. The graph
+    provides _get_sorted_children, _get_parents (both live nodes only), a
+    _get_depth that appends the tails of back edges to loop_tails as
+    DBG._get_depth does, and _deepest.
+    """
+    tracked: bool = False
+    cycle_reach: bytearray
+
+    def _deepest(self) -> int:
+        """Id of the live node with the greatest depth, the lowest on ties; -1 if none is live."""
+        raise NotImplementedError
+
+    def _get_links(self, idx) -> Iterable[int]:
+        return itertools.chain(self._get_parents(idx), self._get_sorted_children(idx))
+
+    def _get_longest_path_incremental(self):
+        if not self.tracked:
+            self._reset()
+            self.loop_tails = []
+            # checked here, as _get_depth is a call and sets up its views even for a visited node
+            visited = memoryview(self.visited)
+            for idx in itertools.compress(range(self.kmer_count), memoryview(self.alive)):
+                if not visited[idx]:
+                    self._get_depth(idx)
+            self._find_cycles()
+            self.tracked = True
+        else:
+            if self.dirty:
+                self._redo_components(self.dirty)
+            alive = memoryview(self.alive)
+            for idx in self.stale:
+                if alive[idx]:
+                    self._get_depth(idx)
+        self.stale = []
+        self.dirty = []
+        self.loop_tails = []
+
+        path: list[int] = []
+        max_depth_child = memoryview(self.max_depth_child)
+        idx = self._deepest()
+        while idx >= 0:
+            path.append(idx)
+            idx = max_depth_child[idx]
+        return path
+
+    def _find_cycles(self):
+        # as DBG._find_cycles, with a flag per node instead of a set
+        reach = bytearray(self.kmer_count)
+        todo = list(self.loop_tails)
+        for idx in todo:
+            reach[idx] = 1
+        while todo:
+            for parent in self._get_parents(todo.pop()):
+                if not reach[parent]:
+                    reach[parent] = 1
+                    todo.append(parent)
+        self.cycle_reach = reach
+
+    def _clear(self, idx: int):
+        self.visited[idx] = False
+        self.depth[idx] = 0
+        self.max_depth_child[idx] = -1
+
+    def _redo_components(self, seeds: list[int]):
+        alive = memoryview(self.alive)
+        members = {idx for idx in seeds if alive[idx]}
+        todo = list(members)
+        while todo:
+            for other in self._get_links(todo.pop()):
+                if other not in members:
+                    members.add(other)
+                    todo.append(other)
+        order = sorted(members)
+        for idx in order:
+            self._clear(idx)
+        visited = memoryview(self.visited)
+        for idx in order:
+            if not visited[idx]:
+                self._get_depth(idx)
+
+    def _invalidate_ancestors(self, frontier: list[int]) -> bool:
+        alive = memoryview(self.alive)
+        visited = memoryview(self.visited)
+        while frontier:
+            idx = frontier.pop()
+            if not alive[idx] or not visited[idx]:
+                continue
+            if self.cycle_reach[idx]:
+                return False
+            self._clear(idx)
+            self.stale.append(idx)
+            frontier.extend(self._get_parents(idx))
+        return True
+
+    def _delete_path(self, path):
+        alive = memoryview(self.alive)
+        depth = memoryview(self.depth)
+        for idx in path:
+            alive[idx] = False
+            depth[idx] = 0
+        frontier: list[int] = []
+        children: list[int] = []
+        for idx in path:
+            frontier.extend(self._get_parents(idx))
+            children.extend(self._get_sorted_children(idx))
+        self._record_delete(len(path), len(frontier) + len(children))
+        if self.tracked:
+            neighbours = frontier + children
+            if any(self.cycle_reach[idx] for idx in path) or not self._invalidate_ancestors(frontier):
+                self.dirty.extend(neighbours)
+
+    def _drop_heap(self):
+        self.tracked = False
+        self.stale = []
+        self.dirty = []
@@ -0,0 +1,96 @@
+"""
+2-bit packed k-mer encoding.
+
+Bases are packed two bits each (A=0, C=1, G=2, T=3) with the first base in
+the most significant position, so a k-mer with k <= 32 fits in a uint64 and
+integer order matches lexicographic order of the string.
+"""
+from typing import Optional
+
+BASES = 'ACGT'
+MAX_K = 32
+
+# base to code for str input; bytes-like input goes through _BYTE_CODE, so
+# neither table mixes key types (Codon types them statically)
+_CODE: dict[str, int] = {}
+for _i in range(4):
+    _CODE[BASES[_i]] = _i
+
+# byte value to base code; a list lookup is cheaper than the dict when walking bytes
+_BYTE_CODE: list[Optional[int]] = [None] * 256
+for _i in range(4):
+    _BYTE_CODE[ord(BASES[_i])] = _i
+
+# the same map as a bytes.translate table, with 4 for a non-base
+_BYTE_TABLE = bytes(4 if code is None else code for code in _BYTE_CODE)
+
+
+def kmer_mask(k: int) -> int:
+    return (1 << (2 * k)) - 1
+
+
+def encode(kmer) -> int:
+    code = 0
+    if isinstance(kmer, str):
+        for base in kmer:
+            code = (code << 2) | _CODE[base]
+    else:
+        for byte in kmer:
+            code = (code << 2) | _BYTE_CODE[byte]
+    return code
+
+
+def decode(code: int, k: int) -> str:
+    chars = [''] * k
+    for i in range(k - 1, -1, -1):
+        chars[i] = BASES[code & 3]
+        code >>= 2
+    return ''.join(chars)
+
+
+def reverse_complement_code(code: int, k: int) -> int:
+    """Reverse complement of a packed k-mer, using 64-bit swaps instead of a per-base loop."""
+    # complementing is a bitwise not because A/T and C/G codes sum to 3
+    x = ~code & kmer_mask(MAX_K)
+    # reverse the order of the 2-bit groups within the 64-bit word
+    x = ((x >> 2) & 0x3333333333333333) | ((x & 0x3333333333333333) << 2)
+    x = ((x >> 4) & 0x0F0F0F0F0F0F0F0F) | ((x & 0x0F0F0F0F0F0F0F0F) << 4)
+    x = ((x >> 8) & 0x00FF00FF00FF00FF) | ((x & 0x00FF00FF00FF00FF) << 8)
+    x = ((x >> 16) & 0x0000FFFF0000FFFF) | ((x & 0x0000FFFF0000FFFF) << 16)
+    x = ((x >> 32) & 0x00000000FFFFFFFF) | ((x & 0x00000000FFFFFFFF) << 32)
+    return x >> (64 - 2 * k)
+
+
+def encode_read(read, k: int) -> tuple[list[int], list[int]]:
+    """
+    Packed k-mers of a read and of its reverse complement, in read order.
+    Both strands are rolled along together, so each base costs a couple of
+    integer operations and no substring is ever created. A read may be a str
+    or any bytes-like object, such as a memoryview into a mapped file.
+    """
+    mask = kmer_mask(k)
+    shift = 2 * (k - 1)
+    fwd: list[int] = []
+    rev: list[int] = []
+    code = 0
+    rc = 0
+    # one branch per input type, so each one uses a single typed table
+    if isinstance(read, str):
+        bases = [_CODE[c] for c in read]
+    else:
+        # the per-byte lookup happens in C
+        bases = bytes(read).translate(_BYTE_TABLE)
+        if bases and max(bases) > 3:
+            raise ValueError("read holds a byte other than A, C, G or T")
+    # i is the start of the k-mer ending at the current base
+    i = 1 - k
+    for b in bases:
+        code = ((code << 2) | b) & mask
+        rc = (rc >> 2) | ((3 - b) << shift)
+        if i >= 0:
+            fwd.append(code)
+            rev.append(rc)
+        i += 1
+    # the reverse-complement strand reads the rolled codes back to front
+    rev.reverse()
+    return fwd, rev
@@ -1,40 +1,41 @@
+"""
+Default entry: the str DBG, incremental, and its top 20 contigs at k = 25.
+It imports only dataset, dbg and revcomp, plain Python whose types stay
+the same on every path, so that it can be compiled with Codon
+(`codon run -release main.py data_dir`). Reads are cleaned by
+revcomp.clean_reads, as in cli.py, which holds the other modes.
+"""
+from dataset import get_n50, read_lines
 from dbg import DBG
-from utils import read_data
+from revcomp import clean_reads
 
 import sys
 import time
 
+K = 25
+CONTIGS = 20
 
-def get_n50(arr) -> int:
-    mid_pt = sum(arr) / 2
-    loc = 0
-    for ctg in arr:
-        curr = ctg
-        loc += curr
-        if loc >= mid_pt:
-            return curr
+
+def read_data(path: str) -> list[str]:
+    """Reads of a dataset, upper-cased and cut at anything other than A, C, G or T, of at least K bases."""
+    return list(clean_reads(read_lines(path), K))
 
 
 def main():
     start_time = time.time()
 
-    argv = sys.argv
-    data_list = read_data(argv[1])
-
-    k = 25
-    dbg = DBG(k=k, data_list=data_list)
-    ctg_info = []
-    out_path = argv[1] + '/' + 'contig.fasta'
+    data_list = read_data(sys.argv[1])
+    dbg = DBG(k=K, data_list=data_list, incremental=True)
+    ctg_info: list[int] = []
+    out_path = sys.argv[1] + '/' + 'contig.fasta'
     with open(out_path, 'w') as f:
-        for i in range(20):
-            c = dbg.get_longest_contig()
-            if c is None:
-                break
-            f.write('>contig_'+ str(i) +'\n')
-            f.write(c + '\n')
-            ctg_info.append(len(c))
+        contigs = dbg.get_top_contigs(CONTIGS)
+        for i in range(len(contigs)):
+            f.write('>contig_' + str(i) + '\n')
+            f.write(contigs[i] + '\n')
+            ctg_info.append(len(contigs[i]))
     total_time = time.time() - start_time
     print(f"{total_time:.2f}    {get_n50(ctg_info)}")
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()
@@ -0,0 +1,192 @@
+from typing import Iterable, Optional
+
+from packed import PackedDBG
+from kmer import kmer_mask
+
+
+class MaskNode:
+    """
+    Node whose adjacency is two 4-bit masks instead of children and parents
+    sets: bit b of succ is set when kmer + b is a child, bit b of pred when
+    b + kmer is a parent. mult optionally holds a saturating count per
+    outgoing base.
+    """
+    __slots__ = ('kmer', 'succ', 'pred', 'mult', 'count', 'visited', 'depth', 'max_depth_child', 'length')
+    kmer: int
+    succ: int
+    pred: int
+    mult: Optional[bytearray]
+    count: int
+    visited: bool
+    depth: int
+    max_depth_child: Optional[int]
+    length: int
+
+    def __init__(self, kmer: int, multiplicity: bool = False):
+        self.kmer = kmer
+        self.succ = 0
+        self.pred = 0
+        self.mult = bytearray(4) if multiplicity else None
+        self.count = 0
+        self.length = 1
+        self.visited = False
+        self.depth = 0
+        self.max_depth_child = None
+
+    def increase(self) -> None:
+        self.count += 1
+
+    def reset(self) -> None:
+        self.visited = False
+        self.depth = 0
+        self.max_depth_child = None
+
+    def get_count(self) -> int:
+        return self.count
+
+
+class MaskDBG(PackedDBG):
+    """
+    Packed DBG with successor and predecessor bitmasks per node. A node has
+    at most four children (one per appended base) and four parents (one per
+    prepended base), so neighbours are recovered by shifting the k-mer and
+    looking it up in kmer2idx. Deleting a path clears one bit in each
+    neighbour; no per-node sets are ever allocated.
+    """
+    multiplicity: bool
+    mask: int
+
+    def __init__(self, k, data_list, incremental: bool = False, scc: bool = False, multiplicity: bool = False,
+                 workers: int = 1, batch: bool = False):
+        # count how often each edge is walked; exact only for the serial build
+        self.multiplicity = multiplicity
+        self.mask = kmer_mask(k)
+        super().__init__(k, data_list, incremental=incremental, scc=scc, workers=workers,
+                         batch=batch)
+
+    def _check(self, data_list: Iterable[str]) -> Iterable[str]:
+        try:
+            # parallel and batch builds add each distinct edge once
+            assert not self.multiplicity or (self.workers == 1 and not self.batch)
+        except Exception as e:
+            print(f"Error in data_list or k: {e}")
+            raise e
+        return super()._check(data_list)
+
+    def _add_node(self, kmer: int) -> int:
+        if kmer not in self.kmer2idx:
+            self.kmer2idx[kmer] = self.kmer_count
+            self.nodes[self.kmer_count] = MaskNode(kmer, self.multiplicity)
+            self.kmer_count += 1
+        idx = self.kmer2idx[kmer]
+        self.nodes[idx].increase()
+        return idx
+
+    def _add_edge(self, idx1: int, idx2: int):
+        node1 = self.nodes[idx1]
+        node2 = self.nodes[idx2]
+        base = node2.kmer & 3
+        node1.succ |= 1 << base
+        node2.pred |= 1 << (node1.kmer >> (2 * self.k - 2))
+        if node1.mult is not None and node1.mult[base] < 255:
+            node1.mult[base] += 1
+
+    def _child(self, kmer: int, base: int) -> int:
+        return self.kmer2idx[((kmer << 2) | base) & self.mask]
+
+    def _parent(self, kmer: int, base: int) -> int:
+        return self.kmer2idx[(base << (2 * self.k - 2)) | (kmer >> 2)]
+
+    def get_multiplicity(self, idx1: int, idx2: int) -> int:
+        """Number of times the edge idx1 -> idx2 was seen, 0 if it is not in the graph."""
+        node = self.nodes[idx1]
+        base = self.nodes[idx2].kmer & 3
+        if not node.succ >> base & 1:
+            return 0
+        return node.mult[base] if node.mult is not None else 1
+
+    def _get_children(self, idx) -> list[int]:
+        # at most four lookups, in base order
+        node = self.nodes[idx]
+        children: list[int] = []
+        for base in range(4):
+            if node.succ >> base & 1:
+                children.append(self._child(node.kmer, base))
+        return children
+
+    def _get_parents(self, idx) -> list[int]:
+        node = self.nodes[idx]
+        return [self._parent(node.kmer, base) for base in range(4) if node.pred >> base & 1]
+
+    def _get_links(self, idx) -> list[int]:
+        return self._get_children(idx) + self._get_parents(idx)
+
+    def _get_sorted_children(self, idx):
+        # ties in count go to the lowest id, as in DBG
+        children = self._get_children(idx)
+        children.sort(key=lambda child: (-self.nodes[child].count, child))
+        return children
+
+    def _get_depth(self, start_idx: int) -> int:
+        """
+        Same iterative post-order walk as DBG._get_depth; the children found
+        on the way down are kept on the stack for the way up.
+        """
+        start_node = self.nodes[start_idx]
+        if start_node.visited:
+            return start_node.depth
+
+        stack: list[tuple[int, Optional[list[int]]]] = [(start_idx, None)]
+        while stack:
+            idx, children = stack.pop()
+            node = self.nodes[idx]
+            if children is None:
+                if node.visited:
+                    continue
+                node.visited = True
+
+                children = self._get_sorted_children(idx)
+                if not children:
+                    node.depth = 1
+                    node.max_depth_child = None
+                    continue
+
+                stack.append((idx, children))
+                for i in range(len(children) - 1, -1, -1):
+                    child = self.nodes[children[i]]
+                    if not child.visited:
+                        stack.append((children[i], None))
+                    elif not child.depth:
+                        # an edge back into the walk, as DBG._get_depth records it
+                        self.loop_tails.append(idx)
+            else:
+                max_depth = 0
+                max_child: Optional[int] = None
+                for child in children:
+                    if self.nodes[child].depth > max_depth:
+                        max_depth = self.nodes[child].depth
+                        max_child = child
+                node.depth = max_depth + 1
+                node.max_depth_child = max_child
+
+        return start_node.depth
+
+    def _delete_path(self, path):
+        frontier: list[int] = []
+        neighbours: list[int] = []
+        for idx in path:
+            node = self.nodes.pop(idx)
+            top = node.kmer >> (2 * self.k - 2)
+            for base in range(4):
+                if node.pred >> base & 1:
+                    parent = self._parent(node.kmer, base)
+                    if parent in self.nodes:
+                        self.nodes[parent].succ &= ~(1 << (node.kmer & 3))
+                        frontier.append(parent)
+                if node.succ >> base & 1:
+                    child = self._child(node.kmer, base)
+                    if child in self.nodes:
+                        self.nodes[child].pred &= ~(1 << top)
+                        neighbours.append(child)
+        if self.depth_heap is not None:
+            self._invalidate(path, frontier, frontier + neighbours)
@@ -0,0 +1,233 @@
+"""
+2-bit packed DBG and the CPython-only modes built on it.
+
+PackedDBG keeps each k-mer as an integer (kmer.py) and adds what the str
+graph of main.py leaves out: the SCC traversal, the batch, parallel,
+Bloom-filtered and external builds, simplification and profiling. cli.py
+and the other graph backends use it; dbg.DBG stays the plain str graph.
+"""
+from typing import Iterable, Optional
+import itertools
+
+from bloom import BloomFilter
+from dbg import DBG, Node
+from kmer import BASES, MAX_K, decode, encode_read
+from profiler import Profiler
+from scc import strongly_connected_components
+from simplify import simplify_graph
+
+# phases recorded once per contig, numbered by the contig they belong to
+_CONTIG_PHASES = ('reset', 'longest_path', 'concat_path', 'delete_path')
+
+
+class PackedNode(Node):
+    __slots__ = ()
+    kmer: int
+
+
+class PackedDBG(DBG):
+    kmer2idx: dict[int, int]
+    scc: bool
+    workers: int
+    batch: bool
+    simplify: bool
+    tip_length: int
+    bubble_length: int
+    min_coverage: int
+    bloom: Optional[BloomFilter]
+    memory_budget: int
+    profiler: Optional[Profiler]
+    def __init__(self, k, data_list, incremental: bool = False, compact: bool = False, scc: bool = False,
+                 workers: int = 1, batch: bool = False, simplify: bool = False,
+                 tip_length: Optional[int] = None, bubble_length: Optional[int] = None, min_coverage: int = 0,
+                 bloom: Optional[BloomFilter] = None, memory_budget: int = 0,
+                 profiler: Optional[Profiler] = None):
+        # longest path by topological DP over strongly connected components
+        self.scc = scc
+        # processes counting k-mers during the build
+        self.workers = workers
+        # count k-mers with vectorized NumPy passes
+        self.batch = batch
+        # clip tips and pop bubbles shorter than these (2k k-mers by default), drop edges below min_coverage
+        self.simplify = simplify
+        self.tip_length = 2 * k if tip_length is None else tip_length
+        self.bubble_length = 2 * k if bubble_length is None else bubble_length
+        self.min_coverage = min_coverage
+        # k-mers only enter the graph if this filter saw them at two positions or more (serial build only)
+        self.bloom = bloom
+        # count k-mers in on-disk buckets within this many bytes of working memory (serial build only)
+        self.memory_budget = memory_budget
+        # records time, memory and counters per phase when given
+        self.profiler = profiler
+        super().__init__(k, data_list, incremental=incremental, compact=compact)
+
+    def _check(self, data_list: Iterable[str]) -> Iterable[str]:
+        try:
+            assert self.k <= MAX_K
+            # the SCC pass replaces the traversal the incremental mode keeps
+            assert not (self.scc and self.incremental)
+            assert not (self.batch or self.workers > 1) or self.k < MAX_K
+            assert self.bloom is None or (self.workers == 1 and not self.batch)
+            assert not self.memory_budget or (self.k < MAX_K and self.workers == 1
+                                              and not self.batch and self.bloom is None)
+        except Exception as e:
+            print(f"Error in data_list or k: {e}")
+            raise e
+        return super()._check(data_list)
+
+    def _build(self, data_list: Iterable[str]):
+        if self.batch:
+            # NumPy is only needed for this mode
+            from batch import build_batch
+            build_batch(self, data_list)
+        elif self.workers > 1:
+            # the workers count with NumPy as the batch build does
+            from parallel import build_parallel
+            build_parallel(self, data_list, self.workers)
+        elif self.memory_budget:
+            # the buckets are counted with NumPy as the batch build does
+            from external import build_external
+            build_external(self, data_list, self.memory_budget)
+        elif self.bloom is not None:
+            self._build_filtered(data_list)
+        else:
+            self._build_packed(data_list)
+
+    def _build_packed(self, data_list: Iterable[str]):
+        # same arc order as the string build, so node ids and contigs are identical
+        for original in data_list:
+            fwd, rev = encode_read(original, self.k)
+            for i in range(len(fwd) - 1):
+                self._add_arc(fwd[i], fwd[i + 1])
+                self._add_arc(rev[i], rev[i + 1])
+
+    def _build_filtered(self, data_list: Iterable[str]):
+        """
+        Packed build that keeps k-mers seen at only one position out of the
+        graph. A first pass runs every occurrence through the filter and
+        keeps the k-mers it has seen before; a second pass adds arcs as the
+        plain packed build does, counting every occurrence of a solid k-mer
+        and adding an edge only between two solid k-mers. The graph is the
+        unfiltered one restricted to the solid k-mers, up to the filter's
+        false positives. The reads are held for the second pass.
+        """
+        reads = list(data_list)
+        solid: set[int] = set()
+        for original in reads:
+            fwd, rev = encode_read(original, self.k)
+            for code in itertools.chain(fwd, rev):
+                if self.bloom.add(code):
+                    solid.add(code)
+        for original in reads:
+            fwd, rev = encode_read(original, self.k)
+            for i in range(len(fwd) - 1):
+                self._add_solid_arc(fwd[i], fwd[i + 1], solid)
+                self._add_solid_arc(rev[i], rev[i + 1], solid)
+
+    def _add_solid_arc(self, kmer1: int, kmer2: int, solid: set[int]):
+        # an unsolid end drops the edge but not the other end's count
+        idx1 = self._add_node(kmer1) if kmer1 in solid else -1
+        idx2 = self._add_node(kmer2) if kmer2 in solid else -1
+        if idx1 >= 0 and idx2 >= 0:
+            self._add_edge(idx1, idx2)
+
+    def _add_node(self, kmer: int) -> int:
+        if kmer not in self.kmer2idx:
+            self.kmer2idx[kmer] = self.kmer_count
+            self.nodes[self.kmer_count] = PackedNode(kmer)
+            self.kmer_count += 1
+        idx = self.kmer2idx[kmer]
+        self.nodes[idx].increase()
+        return idx
+
+    def _after_build(self, compact: bool):
+        if self.simplify:
+            with self._phase('simplify'):
+                simplify_graph(self, self.tip_length, self.bubble_length, self.min_coverage)
+        super()._after_build(compact)
+
+    def _chain_kmer(self, kmer: int, chain: list[Node]) -> int:
+        for node in chain:
+            kmer = (kmer << 2) | (node.kmer & 3)
+        return kmer
+
+    def _get_longest_path(self):
+        if self.scc:
+            return self._get_longest_path_scc()
+        return super()._get_longest_path()
+
+    def _get_longest_path_scc(self):
+        """
+        Longest path by DP over the condensation of strongly connected
+        components, sinks first. Inside a component only edges to nodes
+        discovered later are followed, which breaks every cycle by DFS order,
+        so the result is deterministic and the pass is linear and iterative.
+        """
+        components, _ = strongly_connected_components(self.nodes.keys(), self._get_sorted_children)
+        for component in components:
+            # Tarjan pops a component in decreasing discovery order, so the
+            # children a node may use inside it are already done (visited)
+            for idx in component:
+                node = self.nodes[idx]
+                max_depth = 0
+                max_child: Optional[int] = None
+                for child in self._get_sorted_children(idx):
+                    child_node = self.nodes[child]
+                    if child_node.visited and child_node.depth > max_depth:
+                        max_depth = child_node.depth
+                        max_child = child
+                node.depth = max_depth + node.length
+                node.max_depth_child = max_child
+                node.visited = True
+
+        max_depth = 0
+        max_idx: Optional[int] = None
+        for idx in self.nodes.keys():
+            if self.nodes[idx].depth > max_depth:
+                max_depth = self.nodes[idx].depth
+                max_idx = idx
+
+        path: list[int] = []
+        while max_idx is not None:
+            path.append(max_idx)
+            max_idx = self.nodes[max_idx].max_depth_child
+        return path
+
+    def _heap_traversal(self) -> bool:
+        return not self.scc
+
+    def _concat_path(self, path):
+        if len(path) < 1:
+            return None
+        # each next node overlaps the previous one by k - 1 bases; decode only
+        # here: the first node in full, then the new bases of each next one
+        first = self.nodes[path[0]]
+        chars = [decode(first.kmer, first.length + self.k - 1)]
+        for i in range(1, len(path)):
+            node = self.nodes[path[i]]
+            if node.length == 1:
+                chars.append(BASES[node.kmer & 3])
+            else:
+                chars.append(decode(node.kmer & ((1 << (2 * node.length)) - 1), node.length))
+        return ''.join(chars)
+
+    def _phase(self, name: str):
+        if self.profiler is None:
+            return super()._phase(name)
+        contig = len(self.profiler.contigs) if name in _CONTIG_PHASES else None
+        return self.profiler.phase(name, contig)
+
+    def _record_walk(self, visits: int, high: int):
+        if self.profiler is not None:
+            self.profiler.count('nodes_visited', visits)
+            self.profiler.mark('stack', high)
+
+    def _record_delete(self, nodes: int, edges: int):
+        if self.profiler is not None:
+            self.profiler.count('nodes_deleted', nodes)
+            self.profiler.count('edges_deleted', edges)
+            self.profiler.count('nodes_invalidated', len(self.stale))
+
+    def _record_contig(self, length: int, nodes: int):
+        if self.profiler is not None:
+            self.profiler.contig(length, nodes)
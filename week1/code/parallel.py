@@ -0,0 +1,70 @@
+"""
+Parallel graph construction for PackedDBG and CSRDBG.
+
+Each worker of a process pool runs the vectorized count of batch.py over
+one contiguous range of reads and returns the per-chunk NumPy arrays. The
+reads are parsed once in the parent and shared with the forked workers, as
+sweep.py does, so only those arrays travel between processes.
+
+The parent merges the chunks with merge_counts, exactly as a serial
+count_kmers merges its own chunks: a few np.unique and bincount calls,
+with no Python work per k-mer. Node ids, counts and edges come out
+identical to a serial build. A CSRDBG freezes the merged arrays directly;
+a PackedDBG still adds one node and edge per distinct k-mer, as the batch
+build does.
+"""
+from typing import Iterable
+import gc
+import multiprocessing
+
+from batch import CHUNK_BASES, count_chunks, fill, merge_counts
+
+# read ranges per worker; several even out ranges whose reads differ in distinct k-mers
+RANGES_PER_WORKER = 4
+
+_READS: list = []
+
+
+def _ranges(reads: list, parts: int) -> list[tuple[int, int]]:
+    """Split the reads into at most `parts` contiguous ranges of about equal length."""
+    total = sum(len(read) for read in reads)
+    bounds = [0]
+    size = 0
+    for i, read in enumerate(reads):
+        size += len(read)
+        if size * parts >= total * len(bounds) and len(bounds) < parts:
+            bounds.append(i + 1)
+    if bounds[-1] != len(reads):
+        bounds.append(len(reads))
+    return list(zip(bounds, bounds[1:]))
+
+
+def _count_range(task: tuple[int, int, int, int]) -> list[tuple]:
+    k, chunk_bases, start, stop = task
+    return count_chunks(_READS[start: stop], k, chunk_bases)
+
+
+def count_parallel(data_list: Iterable[str], k: int, workers: int,
+                   chunk_bases: int = CHUNK_BASES) -> tuple:
+    """count_kmers over a pool of forked workers, one range of reads each."""
+    global _READS
+    _READS = list(data_list)
+    # frozen objects are never scanned, so forked workers leave the parent's pages shared
+    gc.freeze()
+    try:
+        # fork shares the reads, views into mapped files included, without pickling them
+        ctx = multiprocessing.get_context('fork')
+        with ctx.Pool(workers) as pool:
+            tasks = [(k, chunk_bases, start, stop)
+                     for start, stop in _ranges(_READS, RANGES_PER_WORKER * workers)]
+            # ranges come back in read order, so the chunks do too
+            parts = [part for counted in pool.map(_count_range, tasks, chunksize=1) for part in counted]
+    finally:
+        gc.unfreeze()
+        _READS = []
+    return merge_counts(parts, k)
+
+
+def build_parallel(dbg, data_list: Iterable[str], workers: int, chunk_bases: int = CHUNK_BASES):
+    """Fill a packed DBG from counts taken over a pool of workers."""
+    fill(dbg, *count_parallel(data_list, dbg.k, workers, chunk_bases))
@@ -0,0 +1,99 @@
+"""
+Phase-level instrumentation for the assembler.
+
+A Profiler handed to DBG records every phase (build, simplify, compact
+and, per contig, reset, longest path, concatenation and deletion) with
+its wall time, the process peak RSS at its end, the counters it bumped
+and its high-water marks. With trace_memory it also records the
+tracemalloc peak of each phase; that is exact per phase but slows
+allocation-heavy code down considerably. DBG only touches the profiler
+when one was given, so there is nothing to pay when profiling is off.
+"""
+from typing import Iterator, Optional
+import contextlib
+import json
+import resource
+import time
+import tracemalloc
+
+
+def _rss_mb() -> float:
+    # ru_maxrss is in KiB on Linux
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+class Profiler:
+    trace_memory: bool
+    phases: list[dict]
+    counters: dict[str, int]
+    high_water: dict[str, int]
+    contigs: list[dict]
+
+    def __init__(self, trace_memory: bool = False):
+        self.trace_memory = trace_memory
+        self.phases = []
+        self.counters = {}
+        self.high_water = {}
+        self.contigs = []
+        self._phase_high: dict[str, int] = {}
+        self._start = time.perf_counter()
+        self._started_tracing = trace_memory and not tracemalloc.is_tracing()
+        if self._started_tracing:
+            tracemalloc.start()
+
+    def stop(self):
+        """Stop tracemalloc if this profiler started it."""
+        if self._started_tracing:
+            tracemalloc.stop()
+            self._started_tracing = False
+
+    def count(self, name: str, n: int = 1):
+        self.counters[name] = self.counters.get(name, 0) + n
+
+    def mark(self, name: str, value: int):
+        """Raise the high-water mark `name` to value."""
+        if value > self._phase_high.get(name, 0):
+            self._phase_high[name] = value
+        if value > self.high_water.get(name, 0):
+            self.high_water[name] = value
+
+    @contextlib.contextmanager
+    def phase(self, name: str, contig: Optional[int] = None) -> Iterator[None]:
+        before = dict(self.counters)
+        self._phase_high = {}
+        if self.trace_memory:
+            tracemalloc.reset_peak()
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            record: dict = {'phase': name, 'time': time.perf_counter() - start, 'rss_peak_mb': _rss_mb()}
+            if contig is not None:
+                record['contig'] = contig
+            if self.trace_memory:
+                record['traced_peak_mb'] = tracemalloc.get_traced_memory()[1] / (1 << 20)
+            record['counters'] = {key: value - before.get(key, 0) for key, value in self.counters.items()
+                                  if value != before.get(key, 0)}
+            record['high_water'] = self._phase_high
+            self.phases.append(record)
+
+    def contig(self, length: int, nodes: int):
+        self.contigs.append({'contig': len(self.contigs), 'length': length, 'nodes': nodes})
+
+    def report(self) -> dict:
+        totals: dict[str, float] = {}
+        for record in self.phases:
+            totals[record['phase']] = totals.get(record['phase'], 0.0) + record['time']
+        return {
+            'total_time': time.perf_counter() - self._start,
+            'rss_peak_mb': _rss_mb(),
+            'phase_totals': totals,
+            'counters': self.counters,
+            'high_water': self.high_water,
+            'contigs': self.contigs,
+            'phases': self.phases,
+        }
+
+    def dump(self, path: str):
+        with open(path, 'w') as f:
+            json.dump(self.report(), f, indent=1)
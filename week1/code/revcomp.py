@@ -0,0 +1,113 @@
+"""
+Table-driven reverse complement and ambiguous-base cleanup for batches of reads.
+
+Both work on a whole batch at once: the reads are joined with a separator,
+pushed through one bytes.translate, and split again, so the per-base work
+happens in C. Lowercase bases are upper-cased. Any byte other than
+A, C, G or T is ambiguous and becomes N. clean_reads cuts reads at those
+bases, so the packed build only ever sees A, C, G and T.
+
+str reads take a per-read path instead, which is what main.py runs: this
+module is part of the Codon build, so its top level holds no bytes objects
+and the translate tables are made by the functions that use them.
+"""
+from typing import Iterable, Iterator
+import itertools
+
+# reads cleaned per translate pass
+BATCH_SIZE = 2000
+
+_BASES = 'ACGT'
+
+# complement of a str base, either case
+_PAIR = {'A': 'T', 'C': 'G', 'G': 'C', 'T': 'A', 'a': 'T', 'c': 'G', 'g': 'C', 't': 'A'}
+
+
+def _clean_table() -> bytes:
+    # upper-case, every other byte becomes N; the separator survives
+    table = bytearray(b'N' * 256)
+    table[ord('\n')] = ord('\n')
+    for base in b'ACGTacgt':
+        table[base] = ord(chr(base).upper())
+    return bytes(table)
+
+
+def _complement_table() -> bytes:
+    # complement of the cleaned bases
+    table = bytearray(_clean_table())
+    for a, b in zip(b'ACGTacgt', b'TGCATGCA'):
+        table[a] = b
+    return bytes(table)
+
+
+def _join(reads: list) -> tuple[bytes, bool]:
+    """Reads joined by the separator as bytes, and whether they were str."""
+    if isinstance(reads[0], str):
+        # anything outside ASCII is ambiguous too
+        return '\n'.join(reads).encode('ascii', errors='replace'), True
+    return b'\n'.join(reads), False
+
+
+def reverse_complement(read):
+    """Reverse complement of one str or bytes-like read, as str or bytes respectively."""
+    if isinstance(read, str):
+        return ''.join([_PAIR.get(base, 'N') for base in reversed(read)])
+    return bytes(read).translate(_complement_table())[::-1]
+
+
+def reverse_complement_batch(reads: Iterable) -> list:
+    """
+    Reverse complements of str or bytes-like reads, as str or bytes
+    respectively, in the order given. Ambiguous bases come out as N.
+    """
+    reads = list(reads)
+    if not reads:
+        return []
+    joined, text = _join(reads)
+    # reversing the whole batch reverses every read and the order of the reads
+    out = joined.translate(_complement_table())[::-1].split(b'\n')
+    out.reverse()
+    return [seq.decode('ascii') for seq in out] if text else out
+
+
+def _clean_batch(reads: list, min_length: int) -> list:
+    joined = b'\n'.join(reads)
+    if not joined.translate(None, b'ACGT\n'):
+        # nothing to fix: the reads are passed on as they are, views included
+        return [read for read in reads if len(read) >= min_length]
+    return [seg for seg in joined.translate(_clean_table()).replace(b'N', b'\n').split(b'\n')
+            if len(seg) >= min_length]
+
+
+def _clean_text(read: str, min_length: int) -> list[str]:
+    read = read.upper()
+    if sum(read.count(base) for base in _BASES) == len(read):
+        # the common case: nothing to cut
+        return [read] if len(read) >= min_length else []
+    segments: list[str] = []
+    start = 0
+    for i in range(len(read) + 1):
+        if i == len(read) or read[i] not in _BASES:
+            if i - start >= min_length:
+                segments.append(read[start:i])
+            start = i + 1
+    return segments
+
+
+def clean_reads(reads: Iterable, min_length: int, batch_size: int = BATCH_SIZE) -> Iterator:
+    """
+    Split str or bytes-like reads at ambiguous bases into upper-case A/C/G/T
+    segments, dropping segments shorter than min_length (k, for a build).
+    Batches of bytes-like reads without an ambiguous or lowercase base pass
+    through untouched, views included.
+    """
+    reads = iter(reads)
+    while True:
+        batch = list(itertools.islice(reads, batch_size))
+        if not batch:
+            return
+        if isinstance(batch[0], str):
+            for read in batch:
+                yield from _clean_text(read, min_length)
+        else:
+            yield from _clean_batch(batch, min_length)
@@ -0,0 +1,54 @@
+from typing import Callable, Iterable, Iterator
+
+
+def strongly_connected_components(vertices: Iterable[int],
+                                  children: Callable[[int], Iterable[int]]) -> tuple[list[list[int]], dict[int, int]]:
+    """
+    Iterative Tarjan over the graph given by `children`, started from each
+    vertex in the given order.
+
+    Returns the components in reverse topological order (a component only
+    reaches itself and components listed before it) and the DFS discovery
+    index of every vertex. No recursion, so path length is not bounded by
+    the stack size.
+    """
+    index: dict[int, int] = {}
+    low: dict[int, int] = {}
+    on_stack: set[int] = set()
+    stack: list[int] = []
+    components: list[list[int]] = []
+
+    for root in vertices:
+        if root in index:
+            continue
+        index[root] = low[root] = len(index)
+        stack.append(root)
+        on_stack.add(root)
+        # each vertex keeps an iterator over its children, so a descent resumes where it left off
+        work: list[tuple[int, Iterator[int]]] = [(root, iter(children(root)))]
+        while work:
+            v, succ = work[-1]
+            for w in succ:
+                if w not in index:
+                    index[w] = low[w] = len(index)
+                    stack.append(w)
+                    on_stack.add(w)
+                    work.append((w, iter(children(w))))
+                    break
+                if w in on_stack and index[w] < low[v]:
+                    low[v] = index[w]
+            else:
+                work.pop()
+                if work and low[v] < low[work[-1][0]]:
+                    low[work[-1][0]] = low[v]
+                if low[v] == index[v]:
+                    component: list[int] = []
+                    while True:
+                        w = stack.pop()
+                        on_stack.discard(w)
+                        component.append(w)
+                        if w == v:
+                            break
+                    components.append(component)
+
+    return components, index
@@ -0,0 +1,134 @@
+"""
+Graph cleaning between the build and the contig walk.
+
+Sequencing errors leave short dead-end tips, small bubbles next to the true
+path and edges with very little coverage. Each pass below works on the
+children/parents sets of a Node-based DBG. Every walk only moves along
+unbranched chains, and each chain belongs to exactly one start node, so
+every pass is linear in the size of the graph.
+"""
+
+
+def _unbranched(dbg, idx: int) -> bool:
+    node = dbg.nodes[idx]
+    return len(node.parents) == 1 and len(node.children) == 1
+
+
+def _remove(dbg, idx: int):
+    node = dbg.nodes.pop(idx)
+    for parent in node.parents:
+        if parent in dbg.nodes:
+            dbg.nodes[parent].remove_child(idx)
+    for child in node.children:
+        if child in dbg.nodes:
+            dbg.nodes[child].remove_parent(idx)
+
+
+def clip_tips(dbg, max_length: int) -> int:
+    """
+    Remove dead ends of fewer than max_length k-mers that hang off a
+    junction. A chain with no junction at either end is left alone, since it
+    is all there is of its component. Returns the number of removed nodes.
+    """
+    removed = 0
+    for idx in list(dbg.nodes.keys()):
+        if idx not in dbg.nodes:
+            continue
+        node = dbg.nodes[idx]
+        if node.children and node.parents:
+            continue
+        if not node.children and not node.parents:
+            continue
+        # walk from the dead end towards the rest of the graph
+        forward = not node.parents
+        tip = [idx]
+        length = node.length
+        junction = False
+        while length < max_length:
+            cur = dbg.nodes[tip[-1]]
+            nxt = cur.children if forward else cur.parents
+            if len(nxt) != 1:
+                break
+            next_idx = next(iter(nxt))
+            next_node = dbg.nodes[next_idx]
+            back = next_node.parents if forward else next_node.children
+            if len(back) > 1:
+                junction = True
+                break
+            if next_idx == idx:
+                break
+            tip.append(next_idx)
+            length += next_node.length
+        if junction:
+            for tip_idx in tip:
+                _remove(dbg, tip_idx)
+            removed += len(tip)
+    return removed
+
+
+def pop_bubbles(dbg, max_length: int) -> int:
+    """
+    Collapse simple bubbles: two or more unbranched chains of fewer than
+    max_length k-mers that leave the same node and rejoin at the same node.
+    The chain with the highest mean count is kept. Returns the number of
+    removed nodes.
+    """
+    removed = 0
+    for idx in list(dbg.nodes.keys()):
+        if idx not in dbg.nodes or len(dbg.nodes[idx].children) < 2:
+            continue
+        # end node -> (mean count, chain) of each branch reaching it
+        branches: dict[int, list[tuple[float, list[int]]]] = {}
+        for child in dbg.nodes[idx].children:
+            chain: list[int] = []
+            total = 0
+            length = 0
+            cur = child
+            while cur != idx and _unbranched(dbg, cur) and length < max_length:
+                chain.append(cur)
+                total += dbg.nodes[cur].count
+                length += dbg.nodes[cur].length
+                cur = next(iter(dbg.nodes[cur].children))
+            if chain and cur != idx and cur not in chain and length < max_length:
+                branches.setdefault(cur, []).append((total / len(chain), chain))
+        for group in branches.values():
+            if len(group) < 2:
+                continue
+            group.sort(key=lambda branch: branch[0], reverse=True)
+            for _, chain in group[1:]:
+                for chain_idx in chain:
+                    _remove(dbg, chain_idx)
+                removed += len(chain)
+    return removed
+
+
+def remove_low_coverage(dbg, min_coverage: int) -> int:
+    """
+    Drop edges whose coverage, the lower count of their two ends, is below
+    min_coverage, then the nodes left without any edge. Returns the number
+    of removed edges.
+    """
+    removed = 0
+    for idx, node in dbg.nodes.items():
+        weak = [child for child in node.children if min(node.count, dbg.nodes[child].count) < min_coverage]
+        for child in weak:
+            node.remove_child(child)
+            dbg.nodes[child].remove_parent(idx)
+        removed += len(weak)
+    for idx in list(dbg.nodes.keys()):
+        node = dbg.nodes[idx]
+        if not node.children and not node.parents and node.count < min_coverage:
+            del dbg.nodes[idx]
+    return removed
+
+
+def simplify_graph(dbg, tip_length: int, bubble_length: int, min_coverage: int) -> dict[str, int]:
+    """Run the cleaning passes in order; a length or coverage of 0 skips that pass."""
+    stats = {'edges': 0, 'tips': 0, 'bubbles': 0}
+    if min_coverage > 0:
+        stats['edges'] = remove_low_coverage(dbg, min_coverage)
+    if tip_length > 0:
+        stats['tips'] = clip_tips(dbg, tip_length)
+    if bubble_length > 0:
+        stats['bubbles'] = pop_bubbles(dbg, bubble_length)
+    return stats
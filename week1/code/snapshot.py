@@ -0,0 +1,115 @@
+"""
+Binary graph snapshots.
+
+A snapshot holds the CSR arrays of a built graph (k-mers, counts, offsets,
+targets, and the reversed edges as parent_offsets and parents) in one file: a magic string, the length of a JSON header, the
+header itself, then each array at a 64-byte aligned offset. Loading maps
+the arrays with numpy.memmap, so there is nothing to parse and processes
+reading the same snapshot share its pages; the parents are stored rather
+than laid out again, so a warm start does no sorting. The header carries a format
+version and a key made of k and the hashes of the input files; a snapshot
+whose key does not match is ignored.
+"""
+import hashlib
+import json
+import os
+from typing import Optional
+
+import numpy as np
+
+from csr import CSRDBG, csr_layout, parent_layout
+
+MAGIC = b'DBGSNAP\0'
+VERSION = 2
+ALIGN = 64
+
+_ARRAYS = ['kmers', 'counts', 'offsets', 'targets', 'parent_offsets', 'parents']
+_HASH_CHUNK = 1 << 20
+
+
+def snapshot_key(paths: list[str], k: int) -> str:
+    """k plus the SHA-256 of every input file, in order."""
+    digest = hashlib.sha256(f"k={k}".encode('ascii'))
+    for f_loc in paths:
+        with open(f_loc, 'rb') as f:
+            for chunk in iter(lambda: f.read(_HASH_CHUNK), b''):
+                digest.update(chunk)
+        digest.update(b'\0')
+    return digest.hexdigest()
+
+
+def graph_arrays(dbg) -> dict[str, np.ndarray]:
+    """CSR arrays of a CSRDBG, or of a Node-based PackedDBG with its live nodes renumbered."""
+    if hasattr(dbg, 'targets'):
+        return {name: getattr(dbg, name) for name in _ARRAYS}
+    ids = list(dbg.nodes.keys())
+    rank = {idx: i for i, idx in enumerate(ids)}
+    kmers = np.array([dbg.nodes[idx].kmer for idx in ids], dtype=np.uint64)
+    counts = np.array([dbg.nodes[idx].count for idx in ids], dtype=np.uint32)
+    src = np.array([rank[idx] for idx in ids for _ in dbg.nodes[idx].children], dtype=np.int32)
+    dst = np.array([rank[child] for idx in ids for child in dbg.nodes[idx].children], dtype=np.int32)
+    offsets, targets = csr_layout(counts, src, dst)
+    parent_offsets, parents = parent_layout(offsets, targets)
+    return {'kmers': kmers, 'counts': counts, 'offsets': offsets, 'targets': targets,
+            'parent_offsets': parent_offsets, 'parents': parents}
+
+
+def save_snapshot(dbg, path: str, key: str):
+    # packed k-mers, one per node
+    assert all(isinstance(node.kmer, int) and node.length == 1 for node in dbg.nodes.values())
+    arrays = graph_arrays(dbg)
+    entries = []
+    offset = 0
+    for name in _ARRAYS:
+        arr = np.ascontiguousarray(arrays[name])
+        entries.append({'name': name, 'dtype': arr.dtype.str, 'shape': list(arr.shape), 'offset': offset})
+        offset += (arr.nbytes + ALIGN - 1) // ALIGN * ALIGN
+    header = json.dumps({'version': VERSION, 'k': dbg.k, 'key': key, 'arrays': entries}).encode('ascii')
+    start = (len(MAGIC) + 8 + len(header) + ALIGN - 1) // ALIGN * ALIGN
+
+    # written next to the target and renamed, so a reader never sees half a file
+    tmp_path = path + '.tmp'
+    with open(tmp_path, 'wb') as f:
+        f.write(MAGIC)
+        f.write(len(header).to_bytes(8, 'little'))
+        f.write(header)
+        for entry in entries:
+            f.seek(start + entry['offset'])
+            f.write(np.ascontiguousarray(arrays[entry['name']]).tobytes())
+        f.truncate(start + offset)
+    os.replace(tmp_path, path)
+
+
+def _read_header(path: str) -> Optional[tuple[dict, int]]:
+    with open(path, 'rb') as f:
+        if f.read(len(MAGIC)) != MAGIC:
+            return None
+        size = int.from_bytes(f.read(8), 'little')
+        header = json.loads(f.read(size))
+    start = (len(MAGIC) + 8 + size + ALIGN - 1) // ALIGN * ALIGN
+    return header, start
+
+
+def load_snapshot(path: str, key: Optional[str] = None) -> Optional[CSRDBG]:
+    """
+    CSRDBG over the memory-mapped arrays of a snapshot, or None if there is
+    no snapshot, it has another format version, or its key differs.
+    """
+    if not os.path.exists(path):
+        return None
+    found = _read_header(path)
+    if found is None:
+        return None
+    header, start = found
+    if header['version'] != VERSION or (key is not None and header['key'] != key):
+        return None
+    arrays = []
+    for entry in header['arrays']:
+        shape = tuple(entry['shape'])
+        if shape[0] == 0:
+            # a zero-length map is an error, and there is nothing to share anyway
+            arrays.append(np.zeros(shape, dtype=entry['dtype']))
+        else:
+            arrays.append(np.memmap(path, dtype=entry['dtype'], mode='r', offset=start + entry['offset'],
+                                    shape=shape))
+    return CSRDBG(header['k'], [], arrays=tuple(arrays))
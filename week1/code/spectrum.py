@@ -0,0 +1,139 @@
+"""
+k-mer abundance spectrum and automatic coverage cutoff.
+
+The histogram holds, at index c, the number of k-mers with count c. Error
+k-mers pile up at the low end and solid k-mers form a peak around the
+coverage; the valley between the two is where error k-mers stop
+outnumbering solid ones. DBG counts every inner k-mer occurrence twice
+(once per arc end), so the raw histogram alternates between even and odd
+bins, and small bumps on the way down from the errors make dips of their
+own. The valley is therefore searched on sums over a window of several
+bins, and between the error spike and the main peak only.
+
+Cutting at the valley drops the left tail of the solid peak too, and one
+solid k-mer lost breaks a contig in two. At the coverage of the bundled
+datasets that tail is thick, so the cutoff applied is lowered from the
+valley until a Poisson fit at the main peak expects less than SOLID_LOSS
+solid k-mers below it.
+"""
+import json
+import math
+from typing import Optional
+
+import numpy as np
+
+from simplify import remove_low_coverage
+
+# width of the smoothing window; even, so every sum holds as many odd bins as even ones
+SMOOTH_BINS = 6
+# most solid k-mers the applied cutoff may be expected to drop; well under one, as real
+# coverage varies more than the Poisson fit assumes (data2 loses contigs at an expected 1.0)
+SOLID_LOSS = 0.1
+
+
+def graph_counts(dbg) -> np.ndarray:
+    """Counts of the live k-mers of a Node-based or array-backed graph."""
+    if hasattr(dbg, 'counts'):
+        return dbg.counts[dbg.alive]
+    return np.fromiter((node.count for node in dbg.nodes.values()), dtype=np.int64, count=len(dbg.nodes))
+
+
+def histogram(counts: np.ndarray) -> np.ndarray:
+    return np.bincount(np.asarray(counts, dtype=np.int64))
+
+
+def smooth(hist: np.ndarray) -> np.ndarray:
+    """Sum of the SMOOTH_BINS bins around each count, counts c - 2 to c + 3 for a width of 6."""
+    half = SMOOTH_BINS // 2
+    padded = np.concatenate((np.zeros(half - 1, dtype=np.int64), hist, np.zeros(half, dtype=np.int64)))
+    return np.convolve(padded, np.ones(SMOOTH_BINS, dtype=np.int64), 'valid')
+
+
+def valley(hist: np.ndarray) -> tuple[int, int]:
+    """
+    (valley, main peak) of the spectrum. The smoothed curve falls from the
+    error spike, then first rises where the solid k-mers take over; the
+    main peak is its highest point from there on, and the valley its lowest
+    point before the main peak, so later dips on the way up count too.
+    (1, 0) if nothing rises after the error spike.
+    """
+    if len(hist) < 3:
+        return 1, 0
+    smoothed = smooth(hist)
+    errors = int(np.argmax(smoothed))
+    rising = np.flatnonzero(smoothed[errors:-1] < smoothed[errors + 1:])
+    if not len(rising):
+        return 1, 0
+    start = errors + int(rising[0])
+    top = start + int(np.argmax(smoothed[start:]))
+    low = start + int(np.argmin(smoothed[start: top]))
+    return low, peak(hist, low)
+
+
+def solid_loss(hist: np.ndarray, cutoff: int, low: int, top: int) -> float:
+    """
+    Expected number of solid k-mers below the cutoff, taking the k-mers from
+    the valley low up as solid and their occurrences as Poisson with the
+    mean the main peak top gives. Every occurrence inside a read adds 2 to
+    the count; a solid k-mer is taken to have one at least, and the
+    cutoff drops those with up to (cutoff - 1) // 2 of them.
+    """
+    rate = top / 2
+    below = sum(math.exp(-rate) * rate ** x / math.factorial(x) for x in range(1, (cutoff - 1) // 2 + 1))
+    return float(hist[low:].sum()) * below / (1 - math.exp(-rate))
+
+
+def coverage_cutoff(hist: np.ndarray) -> int:
+    """
+    Lowest count to keep: the valley, lowered while the cut would be
+    expected to drop SOLID_LOSS solid k-mers or more. Without a valley
+    nothing is cut and 1 is returned.
+    """
+    low, top = valley(hist)
+    if not top:
+        return 1
+    cutoff = low
+    # down to 2 at worst, which only drops k-mers seen once at the end of a read
+    while solid_loss(hist, cutoff, low, top) >= SOLID_LOSS:
+        cutoff -= 1
+    return cutoff
+
+
+def peak(hist: np.ndarray, cutoff: int) -> int:
+    """Most common count at or above the cutoff, an estimate of k-mer coverage."""
+    if cutoff >= len(hist):
+        return 0
+    return cutoff + int(np.argmax(hist[cutoff:]))
+
+
+def export_json(hist: np.ndarray, path: str, k: Optional[int] = None, cutoff: Optional[int] = None):
+    if cutoff is None:
+        cutoff = coverage_cutoff(hist)
+    low, top = valley(hist)
+    report = {
+        'k': k,
+        'cutoff': cutoff,
+        'valley': low,
+        'peak': top or peak(hist, cutoff),
+        'kmers': int(hist.sum()),
+        'solid_kmers': int(hist[cutoff:].sum()),
+        'histogram': hist.tolist(),
+    }
+    with open(path, 'w') as f:
+        json.dump(report, f, indent=1)
+
+
+def apply_cutoff(dbg, cutoff: Optional[int] = None) -> int:
+    """
+    Drop k-mers below the cutoff, the automatic one by default. Node graphs
+    lose their weak edges and the nodes left isolated; array-backed graphs
+    just mark them dead. Returns the cutoff used.
+    """
+    if cutoff is None:
+        cutoff = coverage_cutoff(histogram(graph_counts(dbg)))
+    if cutoff > 1:
+        if hasattr(dbg, 'counts'):
+            dbg.alive &= dbg.counts >= cutoff
+        else:
+            remove_low_coverage(dbg, cutoff)
+    return cutoff
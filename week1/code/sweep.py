@@ -0,0 +1,64 @@
+"""
+Assemble the same reads at several k in parallel and keep the best.
+
+The reads are parsed once in the parent. Workers are forked from it, so
+they all see that one read list through copy-on-write pages instead of
+each re-reading the files. A forked worker's peak RSS counts the pages
+it inherited, so each worker reports how far its peak grew past the RSS
+it started the task with, which is the memory of that k alone.
+"""
+from typing import Iterable
+import multiprocessing
+import time
+
+from dataset import get_n50
+from packed import PackedDBG
+from profiler import _rss_mb
+
+# contigs extracted per k, as cli.py does
+CONTIGS = 20
+
+_READS: list[str] = []
+
+
+def _assemble(task: tuple[int, int]) -> dict:
+    k, contigs = task
+    start_mb = _rss_mb()
+    start = time.time()
+    dbg = PackedDBG(k, _READS, incremental=True)
+    build_time = time.time() - start
+    found: list[str] = []
+    for _ in range(contigs):
+        contig = dbg.get_longest_contig()
+        if contig is None:
+            break
+        found.append(contig)
+    return {
+        'k': k,
+        'build_time': build_time,
+        'time': time.time() - start,
+        'peak_mb': _rss_mb() - start_mb,
+        'n50': get_n50([len(contig) for contig in found]) if found else 0,
+        'contigs': found,
+    }
+
+
+def sweep(reads: Iterable[str], ks: list[int], processes: int, contigs: int = CONTIGS) -> list[dict]:
+    """
+    Build and traverse one graph per k. Returns one result per k, in the
+    order of ks, with timings, peak RSS growth, N50 and the contigs.
+    """
+    global _READS
+    _READS = list(reads)
+    try:
+        # fork shares the parsed reads; a fresh worker per task starts each k from the inherited RSS
+        ctx = multiprocessing.get_context('fork')
+        with ctx.Pool(processes, maxtasksperchild=1) as pool:
+            return pool.map(_assemble, [(k, contigs) for k in ks], chunksize=1)
+    finally:
+        _READS = []
+
+
+def best(results: list[dict]) -> dict:
+    """Result with the highest N50; ties go to the smaller k."""
+    return max(sorted(results, key=lambda result: result['k']), key=lambda result: result['n50'])
@@ -0,0 +1,312 @@
+from array import array
+from typing import Iterable, Iterator, Optional
+
+from flat import FlatTraversal
+from packed import PackedDBG
+from kmer import BASES, decode, encode_read, kmer_mask
+from profiler import Profiler
+
+_EMPTY = 0
+_ID_SHIFT = 32
+_COUNT_SHIFT = 4
+_COUNT_MASK = (1 << (_ID_SHIFT - _COUNT_SHIFT)) - 1
+_COUNT_FIELD = _COUNT_MASK << _COUNT_SHIFT
+_SUCC_MASK = 0xF
+_MIX = 0x9E3779B97F4A7C15
+_WORD = (1 << 64) - 1
+
+
+class KmerTable:
+    """
+    Open-addressing hash table from packed k-mers to node data, in two flat
+    uint64 buffers. A slot holds the k-mer in keys and, in values, the node id
+    (high 32 bits), the count (28 bits, saturating) and a 4-bit successor mask with one
+    bit per next base A/C/G/T. A value of 0 marks an empty slot, which is
+    safe because a stored k-mer always has a count of at least one.
+    Collisions are resolved by linear probing; the table doubles past a 0.7
+    load factor. order lists the k-mers by node id.
+    """
+    keys: array
+    values: array
+    order: array
+    size: int
+    shift: int
+
+    def __init__(self, capacity: int = 1 << 10):
+        bits = max(capacity - 1, 1).bit_length()
+        self.keys = array('Q', bytes(8 << bits))
+        self.values = array('Q', bytes(8 << bits))
+        self.order = array('Q')
+        self.size = 0
+        self.shift = 64 - bits
+
+    def __len__(self) -> int:
+        return self.size
+
+    def _slot(self, key: int) -> int:
+        # Fibonacci hashing spreads the low-entropy packed codes over the table
+        i = ((key * _MIX) & _WORD) >> self.shift
+        mask = len(self.keys) - 1
+        keys = self.keys
+        values = self.values
+        while values[i] != _EMPTY and keys[i] != key:
+            i = (i + 1) & mask
+        return i
+
+    def add(self, key: int, successor: int = -1, times: int = 1) -> int:
+        """Insert or count times occurrences of key, optionally marking a successor base. Returns the node id."""
+        # the probe of _slot, inlined: this runs once per k-mer occurrence
+        keys = self.keys
+        values = self.values
+        mask = len(keys) - 1
+        i = ((key * _MIX) & _WORD) >> self.shift
+        value = values[i]
+        while value != _EMPTY and keys[i] != key:
+            i = (i + 1) & mask
+            value = values[i]
+        if value == _EMPTY:
+            if 10 * (self.size + 1) > 7 * len(keys):
+                self._resize()
+                values = self.values
+                i = self._slot(key)
+            value = self.size << _ID_SHIFT
+            self.keys[i] = key
+            self.order.append(key)
+            self.size += 1
+        # the count saturates instead of carrying into the id bits
+        count = min(((value >> _COUNT_SHIFT) & _COUNT_MASK) + times, _COUNT_MASK)
+        value = (value & ~_COUNT_FIELD) | (count << _COUNT_SHIFT)
+        if successor >= 0:
+            value |= 1 << successor
+        values[i] = value
+        return value >> _ID_SHIFT
+
+    def get(self, key: int) -> int:
+        """Node id of key, or -1 if it is not in the table."""
+        value = self.values[self._slot(key)]
+        return -1 if value == _EMPTY else value >> _ID_SHIFT
+
+    def entry(self, key: int) -> int:
+        """The packed id, count and successor mask of key, or 0 if it is not in the table."""
+        # the probe of _slot, inlined: the traversal runs it for every neighbour it looks at
+        values = self.values
+        keys = self.keys
+        mask = len(keys) - 1
+        i = ((key * _MIX) & _WORD) >> self.shift
+        value = values[i]
+        while value != _EMPTY and keys[i] != key:
+            i = (i + 1) & mask
+            value = values[i]
+        return value
+
+    def count(self, key: int) -> int:
+        return (self.values[self._slot(key)] >> _COUNT_SHIFT) & _COUNT_MASK
+
+    def successors(self, key: int) -> int:
+        return self.values[self._slot(key)] & _SUCC_MASK
+
+    def _resize(self):
+        keys = self.keys
+        values = self.values
+        bits = 64 - self.shift + 1
+        self.keys = array('Q', bytes(8 << bits))
+        self.values = array('Q', bytes(8 << bits))
+        self.shift -= 1
+        for i in range(len(keys)):
+            if values[i] != _EMPTY:
+                j = self._slot(keys[i])
+                self.keys[j] = keys[i]
+                self.values[j] = values[i]
+
+    def __iter__(self) -> Iterator[tuple[int, int, int, int]]:
+        """(k-mer, node id, count, successor mask) of every entry, in slot order."""
+        for i in range(len(self.keys)):
+            value = self.values[i]
+            if value != _EMPTY:
+                yield self.keys[i], value >> _ID_SHIFT, (value >> _COUNT_SHIFT) & _COUNT_MASK, value & _SUCC_MASK
+
+
+class TableDBG(FlatTraversal, PackedDBG):
+    """
+    Packed-mode DBG built on a KmerTable instead of the kmer2idx and nodes
+    dicts: one probe per k-mer of a read finds the node id, bumps its count
+    and records the successor base. Children are recovered by appending each
+    marked base to the k-mer and looking it up, parents by prepending each
+    base and checking its successor mask, and the per-node traversal state
+    lives in flat arrays indexed by node id. get_top_contigs keeps depths
+    between contigs as FlatTraversal does; incremental does the same for
+    get_longest_contig.
+
+    This trades speed for memory, and needs no NumPy. The probes run in the
+    interpreter where the dicts hash in C, so it is the slowest graph, but
+    the smallest: on data4, cli.py -t peaks at 215 MB in 81 s, against
+    2186 MB in 60 s for the dict graph and 323 MB in 37 s for -m 256.
+    """
+    table: KmerTable
+    kmers: array
+    depth: array
+    max_depth_child: array
+    visited: bytearray
+    alive: bytearray
+
+    def __init__(self, k, data_list, incremental: bool = False, profiler: Optional[Profiler] = None):
+        self.table = KmerTable()
+        # node id to k-mer, kept by the table as it inserts
+        self.kmers = self.table.order
+        self.depth = array('q')
+        self.max_depth_child = array('q')
+        self.visited = bytearray()
+        self.alive = bytearray()
+        super().__init__(k, data_list, incremental=incremental, profiler=profiler)
+
+    def _build(self, data_list: Iterable[str]):
+        # One probe per k-mer instead of two per arc: an inner k-mer of a read
+        # is the head of one arc and the tail of the next, so it counts twice.
+        # Ids are still handed out in _add_arc's order (fwd 0, fwd 1, rev 0,
+        # rev 1, then fwd i, rev i), which keeps them equal to DBG's.
+        add = self.table.add
+        for original in data_list:
+            fwd, rev = encode_read(original, self.k)
+            last = len(fwd) - 1
+            if last < 1:
+                continue
+            add(fwd[0], fwd[1] & 3)
+            if last == 1:
+                add(fwd[1])
+                add(rev[0], rev[1] & 3)
+                add(rev[1])
+                continue
+            add(fwd[1], fwd[2] & 3, 2)
+            add(rev[0], rev[1] & 3)
+            add(rev[1], rev[2] & 3, 2)
+            for i in range(2, last):
+                add(fwd[i], fwd[i + 1] & 3, 2)
+                add(rev[i], rev[i + 1] & 3, 2)
+            add(fwd[last])
+            add(rev[last])
+        n = len(self.table)
+        self.kmer_count = n
+        self.depth = array('q', bytes(8 * n))
+        self.max_depth_child = array('q', [-1]) * n
+        self.visited = bytearray(n)
+        self.alive = bytearray(b'\x01') * n
+
+    def _add_node(self, kmer: int) -> int:
+        return self.table.add(kmer)
+
+    def _add_arc(self, kmer1: int, kmer2: int):
+        self.table.add(kmer1, kmer2 & 3)
+        self.table.add(kmer2)
+
+    def _get_count(self, child: int):
+        return self.table.count(self.kmers[child])
+
+    def _get_sorted_children(self, idx):
+        # one probe per child gives its id and count together
+        entry = self.table.entry
+        alive = self.alive
+        kmer = self.kmers[idx]
+        succ = entry(kmer) & _SUCC_MASK
+        shifted = (kmer << 2) & kmer_mask(self.k)
+        ranked: list[tuple[int, int]] = []
+        for base in range(4):
+            if succ >> base & 1:
+                value = entry(shifted | base)
+                child = value >> _ID_SHIFT
+                if alive[child]:
+                    ranked.append((-((value >> _COUNT_SHIFT) & _COUNT_MASK), child))
+        # ties in count go to the lowest id, as in DBG
+        ranked.sort()
+        return [child for _, child in ranked]
+
+    def _get_parents(self, idx):
+        entry = self.table.entry
+        alive = self.alive
+        kmer = self.kmers[idx]
+        bit = 1 << (kmer & 3)
+        shift = 2 * (self.k - 1)
+        parents: list[int] = []
+        for first in range(4):
+            value = entry((first << shift) | (kmer >> 2))
+            # the prepended k-mer may exist and never have been followed by this one
+            if value & bit and alive[value >> _ID_SHIFT]:
+                parents.append(value >> _ID_SHIFT)
+        parents.sort()
+        return parents
+
+    def _get_depth(self, start_idx: int) -> int:
+        """
+        Same iterative post-order walk as DBG._get_depth, over the arrays.
+        The children found on the way down are kept on the stack for the way up.
+        """
+        if self.visited[start_idx]:
+            return self.depth[start_idx]
+
+        stack: list[tuple[int, Optional[list[int]]]] = [(start_idx, None)]
+        while stack:
+            idx, children = stack.pop()
+            if children is None:
+                if self.visited[idx]:
+                    continue
+                self.visited[idx] = 1
+
+                children = self._get_sorted_children(idx)
+                if not children:
+                    self.depth[idx] = 1
+                    self.max_depth_child[idx] = -1
+                    continue
+
+                stack.append((idx, children))
+                for i in range(len(children) - 1, -1, -1):
+                    if not self.visited[children[i]]:
+                        stack.append((children[i], None))
+                    elif not self.depth[children[i]]:
+                        # an edge back into the walk, as in DBG._get_depth
+                        self.loop_tails.append(idx)
+            else:
+                max_depth = 0
+                max_child = -1
+                for child in children:
+                    if self.depth[child] > max_depth:
+                        max_depth = self.depth[child]
+                        max_child = child
+                self.depth[idx] = max_depth + 1
+                self.max_depth_child[idx] = max_child
+
+        return self.depth[start_idx]
+
+    def _reset(self):
+        n = self.kmer_count
+        self.depth = array('q', bytes(8 * n))
+        self.max_depth_child = array('q', [-1]) * n
+        self.visited = bytearray(n)
+        self.loop_tails = []
+
+    def _get_longest_path(self):
+        max_depth = 0
+        max_idx = -1
+        for idx in range(self.kmer_count):
+            if self.alive[idx]:
+                depth = self._get_depth(idx)
+                if depth > max_depth:
+                    max_depth = depth
+                    max_idx = idx
+
+        path: list[int] = []
+        while max_idx >= 0:
+            path.append(max_idx)
+            max_idx = self.max_depth_child[max_idx]
+        return path
+
+    def _deepest(self) -> int:
+        # dead nodes have a depth of 0; index returns the lowest id on ties, as in DBG
+        max_depth = max(self.depth, default=0)
+        return self.depth.index(max_depth) if max_depth else -1
+
+    def _concat_path(self, path):
+        if len(path) < 1:
+            return None
+        chars = [decode(self.kmers[path[0]], self.k)]
+        for i in range(1, len(path)):
+            chars.append(BASES[self.kmers[path[i]] & 3])
+        return ''.join(chars)
@@ -1,23 +1,221 @@
+from array import array
+from typing import Iterator
+import gzip
+import io
+import itertools
+import mmap
+import os
 
-def read_fasta(path, name):
-    data = []
+from dataset import DATA_FILES
+
+# reads come off disk in chunks of this size rather than line by line
+BUFFER_SIZE = 1 << 20
+
+
+def _open_text(f_loc):
+    # gzip is recognised by its magic bytes, whatever the file is called
+    with open(f_loc, 'rb') as f:
+        magic = f.read(2)
+    if magic == b'\x1f\x8b':
+        raw = io.BufferedReader(gzip.open(f_loc, 'rb'), buffer_size=BUFFER_SIZE)
+        return io.TextIOWrapper(raw, encoding='ascii')
+    return open(f_loc, 'r', buffering=BUFFER_SIZE, encoding='ascii')
+
+
+def _iter_fasta(lines: Iterator[str]) -> Iterator[str]:
+    parts: list[str] = []
+    for line in lines:
+        if line[0] == '>':
+            if parts:
+                yield ''.join(parts)
+                parts = []
+        else:
+            parts.append(line)
+    if parts:
+        yield ''.join(parts)
+
+
+def _iter_fastq(lines: Iterator[str]) -> Iterator[str]:
+    for _ in lines:
+        # sequence lines run up to the '+' separator
+        parts: list[str] = []
+        for line in lines:
+            if line[0] == '+':
+                break
+            parts.append(line)
+        seq = ''.join(parts)
+        # quality may start with '@' too, so it is consumed by length
+        qual_len = 0
+        while qual_len < len(seq):
+            line = next(lines, None)
+            if line is None:
+                break
+            qual_len += len(line)
+        if seq:
+            yield seq
+
+
+def iter_reads(f_loc) -> Iterator[str]:
+    """
+    Stream the sequences of a FASTA or FASTQ file, plain or gzip-compressed,
+    one record at a time. Records may span several lines.
+    """
+    with _open_text(f_loc) as f:
+        lines = (line for line in (raw.strip() for raw in f) if line)
+        first = next(lines, None)
+        if first is None:
+            return
+        lines = itertools.chain([first], lines)
+        if first[0] == '@':
+            yield from _iter_fastq(lines)
+        else:
+            yield from _iter_fasta(lines)
+
+
+_SPACE = b' \t\r\n\v\f'
+
+
+def _line_spans(buf) -> Iterator[tuple[int, int]]:
+    """(start, end) of every non-blank line of a buffer, without surrounding whitespace."""
+    pos = 0
+    size = len(buf)
+    while pos < size:
+        end = buf.find(b'\n', pos)
+        if end < 0:
+            end = size
+        start, stop = pos, end
+        while stop > start and buf[stop - 1] in _SPACE:
+            stop -= 1
+        while start < stop and buf[start] in _SPACE:
+            start += 1
+        if stop > start:
+            yield start, stop
+        pos = end + 1
+
+
+class ReadBuffer:
+    """
+    Sequences of a FASTA or FASTQ file, plain or gzip-compressed, as spans of
+    one buffer. A plain file is memory-mapped and every record is a
+    memoryview into the map, so no per-read string is ever built. Gzip input
+    is decompressed into one bytes object, and records spanning several
+    lines are gathered into one, since their bases are not contiguous.
+    """
+    data: memoryview
+    starts: array
+    ends: array
+
+    def __init__(self, f_loc):
+        with open(f_loc, 'rb') as f:
+            if f.read(2) == b'\x1f\x8b':
+                with gzip.open(f_loc, 'rb') as gz:
+                    buf = gz.read()
+            elif os.fstat(f.fileno()).st_size == 0:
+                buf = b''
+            else:
+                # the map outlives the file object; it is released with the last view
+                buf = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        # (start, end) of every sequence line, and where each record's lines begin and end
+        lines = array('Q')
+        bounds = array('Q', [0])
+        spans = _line_spans(buf)
+        first = next(spans, None)
+        if first is not None:
+            spans = itertools.chain([first], spans)
+            if buf[first[0]] == ord('@'):
+                self._parse_fastq(buf, spans, lines, bounds)
+            else:
+                self._parse_fasta(buf, spans, lines, bounds)
+
+        if len(lines) // 2 == len(bounds) - 1:
+            # one line per record: the records are the lines themselves
+            self.data = memoryview(buf)
+            self.starts = lines[0::2]
+            self.ends = lines[1::2]
+            return
+        joined = bytearray()
+        self.starts = array('Q')
+        self.ends = array('Q')
+        for r in range(len(bounds) - 1):
+            self.starts.append(len(joined))
+            for j in range(bounds[r], bounds[r + 1]):
+                joined += buf[lines[2 * j]: lines[2 * j + 1]]
+            self.ends.append(len(joined))
+        self.data = memoryview(joined)
+
+    @staticmethod
+    def _parse_fasta(buf, spans: Iterator[tuple[int, int]], lines: array, bounds: array):
+        for start, end in spans:
+            if buf[start] == ord('>'):
+                # a record without sequence is dropped, as _iter_fasta does
+                if len(lines) // 2 > bounds[-1]:
+                    bounds.append(len(lines) // 2)
+            else:
+                lines.extend((start, end))
+        if len(lines) // 2 > bounds[-1]:
+            bounds.append(len(lines) // 2)
+
+    @staticmethod
+    def _parse_fastq(buf, spans: Iterator[tuple[int, int]], lines: array, bounds: array):
+        for _ in spans:
+            # sequence lines run up to the '+' separator
+            seq_len = 0
+            for start, end in spans:
+                if buf[start] == ord('+'):
+                    break
+                lines.extend((start, end))
+                seq_len += end - start
+            # quality may start with '@' too, so it is consumed by length
+            qual_len = 0
+            while qual_len < seq_len:
+                span = next(spans, None)
+                if span is None:
+                    break
+                qual_len += span[1] - span[0]
+            if seq_len:
+                bounds.append(len(lines) // 2)
+
+    def __len__(self) -> int:
+        return len(self.starts)
+
+    def __getitem__(self, i: int) -> memoryview:
+        return self.data[self.starts[i]: self.ends[i]]
+
+    def __iter__(self) -> Iterator[memoryview]:
+        data = self.data
+        for start, end in zip(self.starts, self.ends):
+            yield data[start: end]
+
+
+def _resolve(path, name) -> str:
     f_loc = path + '/' + name
-    try:
-        with open(f_loc, 'r') as f:
-            for line in f.readlines():
-                line = line.strip()
-                if line[0] != '>':
-                    data.append(line)
-        # print(name, len(data), len(data[0]))
-        return data
-    except Exception as e:
-        print(f"Error reading {f_loc}: {e}")
-        return []
+    if not os.path.exists(f_loc) and os.path.exists(f_loc + '.gz'):
+        f_loc += '.gz'
+    return f_loc
+
+
+def data_files(path) -> list[str]:
+    """The read files of a dataset that exist, plain or gzip-compressed."""
+    return [f_loc for f_loc in (_resolve(path, name) for name in DATA_FILES) if os.path.exists(f_loc)]
+
 
+def read_fasta(path, name) -> Iterator[str]:
+    f_loc = _resolve(path, name)
+    # a dataset may lack one of the files (data4 has no long reads)
+    if not os.path.exists(f_loc):
+        print(f"Error reading {f_loc}: file not found")
+        return
+    yield from iter_reads(f_loc)
 
 
-def read_data(path):
+def read_data(path) -> Iterator[str]:
     short1 = read_fasta(path, "short_1.fasta")
     short2 = read_fasta(path, "short_2.fasta")
     long1 = read_fasta(path, "long.fasta")
-    return short1 + short2 + long1
\ No newline at end of file
+    return itertools.chain(short1, short2, long1)
+
+
+def map_data(path) -> Iterator[memoryview]:
+    """The reads of read_data as memoryviews into each file's ReadBuffer, one file mapped at a time."""
+    return itertools.chain.from_iterable(ReadBuffer(f_loc) for f_loc in data_files(path))
+
@@ -0,0 +1,39 @@
+import pytest
+
+np = pytest.importorskip("numpy")
+
+from week1.code.batch import count_kmers
+from week1.code.packed import PackedDBG
+from week1.code.kmer import encode
+
+DATA = ["ATCGGATTACAGATTACCA", "GATTACAGGT", "CCA", "CCATCGGATT", "TTGACCGTAAC", "ACGT" * 6]
+
+
+def test_count_kmers():
+    k = 5
+    serial = PackedDBG(k, DATA)
+    kmers, counts, src, dst = count_kmers(DATA, k)
+    assert kmers.tolist() == list(serial.kmer2idx.keys())
+    assert counts.tolist() == [node.count for node in serial.nodes.values()]
+    assert sorted(zip(src.tolist(), dst.tolist())) == sorted(
+        (idx, child) for idx, node in serial.nodes.items() for child in node.children)
+
+    # chunk boundaries do not change the result
+    for small, whole in zip(count_kmers(DATA, k, chunk_bases=8), (kmers, counts, src, dst)):
+        assert small.tolist() == whole.tolist()
+
+    with pytest.raises(ValueError):
+        count_kmers(["ACGTNACGT"], k)
+
+
+def test_dbg_batch():
+    k = 4
+    serial = PackedDBG(k, DATA)
+    batch = PackedDBG(k, iter(DATA), batch=True)
+    assert list(batch.kmer2idx.items()) == list(serial.kmer2idx.items())
+    assert batch.kmer2idx[encode("ATCG")] == 0
+    for idx, node in serial.nodes.items():
+        assert batch.nodes[idx].count == node.count
+        assert list(batch.nodes[idx].children) == list(node.children)
+        assert list(batch.nodes[idx].parents) == list(node.parents)
+    assert batch.get_longest_contig() == serial.get_longest_contig()
@@ -0,0 +1,32 @@
+from week1.code.benchmark import compare, revcomp_case, run_case, synthetic_reads
+
+
+def test_synthetic_reads():
+    reads = synthetic_reads(2000, coverage=10, read_length=50, error_rate=0.0)
+    assert len(reads) == 400
+    assert all(len(read) == 50 and set(read) <= set("ACGT") for read in reads)
+    assert synthetic_reads(2000, coverage=10, read_length=50) == synthetic_reads(2000, coverage=10, read_length=50)
+
+
+def test_run_case():
+    result = run_case(synthetic_reads(2000, coverage=10), k=21, repeats=2, contigs=3)
+    assert result["repeats"] == 2 and result["contigs"] == 3
+    assert result["kmers"] > 0 and result["kmers_per_s"] > 0 and result["contigs_per_s"] > 0
+    assert result["peak_mb"] >= 0
+
+
+def test_compare():
+    baseline = {"data1": {"kmers_per_s": 1000.0, "contigs_per_s": 10.0, "peak_mb": 100.0}}
+    same = {"data1": {"kmers_per_s": 900.0, "contigs_per_s": 12.0, "peak_mb": 110.0},
+            "synthetic": {"kmers_per_s": 1.0, "contigs_per_s": 1.0, "peak_mb": 1.0}}
+    assert compare(same, baseline, 0.2) == []
+    worse = {"data1": {"kmers_per_s": 700.0, "contigs_per_s": 10.0, "peak_mb": 130.0}}
+    regressions = compare(worse, baseline, 0.2)
+    assert len(regressions) == 2
+    assert "kmers_per_s" in regressions[0] and "peak_mb" in regressions[1]
+
+
+def test_revcomp_case():
+    result = revcomp_case(synthetic_reads(500, coverage=4), repeats=1)
+    assert result['bases'] == 2000
+    assert result['loop_bases_per_s'] > 0 and result['batch_bases_per_s'] > 0
@@ -0,0 +1,52 @@
+import random
+
+from week1.code.bloom import BloomFilter
+from week1.code.packed import PackedDBG
+from week1.code.kmer import encode
+
+
+def test_bloom_filter():
+    bloom = BloomFilter(1000, 0.01)
+    rng = random.Random(3)
+    keys = [rng.getrandbits(50) for _ in range(1000)]
+    for key in keys:
+        bloom.add(key)
+    # no false negatives
+    assert all(bloom.add(key) for key in keys)
+    assert all(key in bloom for key in keys)
+    others = [rng.getrandbits(50) | (1 << 50) for _ in range(10000)]
+    rate = sum(key in bloom for key in others) / len(others)
+    assert rate < 0.03
+    assert abs(bloom.false_positive_rate(1000) - 0.01) < 0.005
+
+
+def test_bloom_filter_budget():
+    bloom = BloomFilter(1 << 20, 0.001, max_bytes=1024)
+    assert bloom.nbytes() == 1024
+    assert bloom.false_positive_rate(1 << 20) > 0.001
+
+
+def test_dbg_bloom():
+    solid = "TTAGTTGTGCCGCAGCGAAGTAG"
+    error = "GGCATCCATGAC"
+    # GTAGC first occurs at the end of a read, GTAGCC then adds the arc GTAGC -> TAGCC once
+    data = [solid, error, solid, "CGTAGC", "GTAGCC", "TAGCCA"]
+    dbg = PackedDBG(5, data, bloom=BloomFilter(1000, 0.001))
+    full = PackedDBG(5, data)
+    # the single-copy read never enters the graph
+    assert all(encode(error[i: i + 5]) not in dbg.kmer2idx for i in range(len(error) - 4))
+    kept = {kmer for kmer in full.kmer2idx if kmer in dbg.kmer2idx}
+    assert len(dbg.nodes) == len(kept)
+    for kmer, idx in dbg.kmer2idx.items():
+        node = dbg.nodes[idx]
+        ref = full.nodes[full.kmer2idx[kmer]]
+        # only arcs seen in a read between two solid k-mers, and every occurrence counted
+        assert {dbg.nodes[c].kmer for c in node.children} == {full.nodes[c].kmer for c in ref.children} & kept
+        assert node.count == ref.count
+    gtagc = dbg.nodes[dbg.kmer2idx[encode("GTAGC")]]
+    assert dbg.kmer2idx[encode("TAGCC")] in gtagc.children
+    assert dbg.get_longest_contig() == full.get_longest_contig()
+
+    # both k-mers are solid and overlap by k - 1 bases, but never follow each other in a read
+    dbg = PackedDBG(4, ["TTACGT", "CGTCAA", "TTACGT", "CGTCAA"], bloom=BloomFilter(1000, 0.001))
+    assert dbg.kmer2idx[encode("CGTC")] not in dbg.nodes[dbg.kmer2idx[encode("ACGT")]].children
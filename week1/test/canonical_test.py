@@ -0,0 +1,47 @@
+from week1.code.canonical import CanonicalDBG
+from week1.code.dbg import DBG
+from week1.code.dbg import reverse_complement
+from week1.code.kmer import decode, encode, reverse_complement_code
+
+
+def test_canonical_nodes():
+    data = ["ATCGGATTACAGATTACCA", "GATTACAGGT", "CCATCGGATT"]
+    k = 4
+    dbg = DBG(k, data)
+    canonical = CanonicalDBG(k, data)
+    # one node per k-mer / reverse-complement pair, at most half of the two-strand nodes
+    assert 2 * len(canonical.nodes) >= len(dbg.nodes)
+    assert len(canonical.nodes) < len(dbg.nodes)
+    for node in canonical.nodes.values():
+        kmer = decode(node.kmer, k)
+        assert node.kmer <= reverse_complement_code(node.kmer, k)
+        assert node.count == dbg.nodes[dbg.kmer2idx[kmer]].count
+        assert node.count == dbg.nodes[dbg.kmer2idx[reverse_complement(kmer)]].count
+
+
+def test_canonical_contigs():
+    data = ["ATCGGATTACAGCTTACCA"]
+    dbg = DBG(5, data)
+    canonical = CanonicalDBG(5, data)
+    contig = canonical.get_longest_contig()
+    assert contig == dbg.get_longest_contig()
+    # only the walked strand is deleted, its reverse complement is the next contig
+    assert canonical.get_longest_contig() == reverse_complement(contig)
+    assert canonical.get_longest_contig() is None
+    assert len(canonical.nodes) == 0
+
+
+def test_canonical_palindrome():
+    # ACGT is its own reverse complement
+    data = ["GACGTA"]
+    k = 4
+    dbg = DBG(k, data)
+    canonical = CanonicalDBG(k, data)
+    idx = canonical.kmer2idx[encode("ACGT")]
+    assert idx in canonical.palindromes
+    assert canonical.nodes[idx].count == dbg.nodes[dbg.kmer2idx["ACGT"]].count
+    # both strands run through the palindrome, which branches into CGTA and CGTC
+    contig = canonical.get_longest_contig()
+    assert contig in ["GACGTA", "GACGTC"]
+    assert len(contig) == len(dbg.get_longest_contig())
+    assert encode("ACGT") not in [canonical.nodes[i].kmer for i in canonical.nodes]
@@ -0,0 +1,37 @@
+import pytest
+
+from week1.code.cli import check_options
+
+
+@pytest.mark.parametrize("opts, args", [
+    ([], []),
+    ([('-k', '21,25'), ('-b', '1000')], ['data']),
+    ([('-k', '21,25'), ('-p', 'report.json')], ['data']),
+    ([('-b', '1000'), ('-m', '64')], ['data']),
+    ([('-s', 'graph.npz'), ('-j', '2')], ['data']),
+    ([('-j', '0')], ['data']),
+    ([('-k', '21,x')], ['data']),
+    ([('-k', '33')], ['data']),
+    ([('-k', '21,33')], ['data']),
+    ([('-k', '32'), ('-m', '64')], ['data']),
+    ([('-k', '32'), ('-s', 'graph.npz')], ['data']),
+    ([('-t', ''), ('-j', '2')], ['data']),
+    ([('-t', ''), ('-c', 'spectrum.json')], ['data']),
+    ([('-t', ''), ('-k', '21,25')], ['data']),
+])
+def test_check_options_rejects(opts, args, capsys):
+    with pytest.raises(SystemExit) as e:
+        check_options(opts, args)
+    assert e.value.code == 2
+    assert "usage: cli.py" in capsys.readouterr().err
+
+
+def test_check_options_accepts():
+    check_options([('-j', '2'), ('-k', '21,25')], ['data'])
+    check_options([('-b', '1000'), ('-c', 'spectrum.json'), ('-p', 'report.json')], ['data'])
+    check_options([('-s', 'graph.npz'), ('-c', 'spectrum.json')], ['data'])
+    check_options([('-j', '2'), ('-b', '1000')], ['data'])
+    check_options([('-j', '2'), ('-m', '64')], ['data'])
+    check_options([('-k', '32')], ['data'])
+    check_options([('-k', '31'), ('-m', '64')], ['data'])
+    check_options([('-t', ''), ('-p', 'report.json'), ('-k', '32')], ['data'])
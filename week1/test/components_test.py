@@ -0,0 +1,76 @@
+import multiprocessing
+import random
+
+from week1.code import components as components_module
+from week1.code.components import get_top_contigs_parallel, weakly_connected_components
+from week1.code.dbg import DBG
+from week1.code.packed import PackedDBG
+
+
+def _data():
+    rng = random.Random(5)
+    data = []
+    # several unrelated genomes, each read with overlaps, plus a few isolated reads
+    for length in [300, 220, 220, 150]:
+        genome = "".join(rng.choice("ACGT") for _ in range(length))
+        data += [genome[i: i + 50] for i in range(0, length - 50, 9)]
+    data += ["".join(rng.choice("ACGT") for _ in range(30)) for _ in range(5)]
+    return data
+
+
+def test_weakly_connected_components():
+    dbg = DBG(3, ["AACGG", "TTTT"])
+    components = weakly_connected_components(dbg)
+    assert sorted(idx for component in components for idx in component) == sorted(dbg.nodes)
+    for component in components:
+        members = set(component)
+        for idx in component:
+            assert dbg.nodes[idx].children <= members
+            assert dbg.nodes[idx].parents <= members
+    # AAC-ACG-CGG, its reverse complement CCG-CGT-GTT, and the TTT and AAA self-loops
+    assert len(components) == 4
+
+
+def test_get_top_contigs_parallel():
+    data = _data()
+    dbg = PackedDBG(15, data)
+    components = weakly_connected_components(dbg)
+    assert len(components) > 4
+    # the reference is repeated full passes, not get_top_contigs, which runs on the same incremental code
+    repeated = PackedDBG(15, data)
+    serial = [repeated.get_longest_contig() for _ in range(12)]
+    assert get_top_contigs_parallel(dbg, 12, 2) == serial
+    # the parent graph is left untouched
+    assert len(dbg.nodes) == dbg.kmer_count
+    assert get_top_contigs_parallel(dbg, 12, 3, min_length=len(serial[3])) == \
+        [contig for contig in serial if len(contig) >= len(serial[3])]
+
+
+def test_get_top_contigs_parallel_cycles(cyclic_reads):
+    # several components with cycles
+    data = [read for seed in [0, 4, 8, 10] for read in cyclic_reads(seed)]
+    repeated = PackedDBG(5, data)
+    expected = [repeated.get_longest_contig() for _ in range(15)]
+    expected = [contig for contig in expected if contig is not None]
+    assert get_top_contigs_parallel(PackedDBG(5, data), 15, 2) == expected
+
+
+def test_get_top_contigs_parallel_prunes():
+    data = _data()
+    dbg = PackedDBG(15, data)
+    repeated = PackedDBG(15, data)
+    serial = [repeated.get_longest_contig() for _ in range(3)]
+    for workers in [1, 2]:
+        assert get_top_contigs_parallel(PackedDBG(15, data), 3, workers) == serial
+
+    # one worker in process: the longest genome and its reverse complement fill the top 2, so the
+    # other components are never traversed
+    components_module._GRAPH = dbg
+    components_module._BEST = multiprocessing.Array('q', 2)
+    try:
+        found = components_module._extract((sorted(weakly_connected_components(dbg), key=len, reverse=True), 2, 0))
+    finally:
+        components_module._GRAPH = None
+        components_module._BEST = None
+    assert sorted(contig for sequence in found[:2] for _, _, contig in sequence) == sorted(serial[:2])
+    assert not any(found[2:])
@@ -0,0 +1,24 @@
+import os
+import random
+import sys
+
+import pytest
+
+# modules in week1/code import each other by bare name, as they do when run from that directory
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'code'))
+
+
+def _cyclic_reads(seed: int) -> list[str]:
+    # a tandem repeat and a duplicated segment, read with overlaps, give cycles and a graph that is not a chain
+    rng = random.Random(seed)
+    unit = "".join(rng.choice("ACGT") for _ in range(rng.randint(4, 9)))
+    flank = "".join(rng.choice("ACGT") for _ in range(30))
+    genome = flank + unit * rng.randint(2, 4) + "".join(rng.choice("ACGT") for _ in range(30))
+    genome += "".join(rng.choice("ACGT") for _ in range(10)) + genome[10:40]
+    return [genome[i: i + 20] for i in range(0, len(genome) - 20, 3)]
+
+
+@pytest.fixture
+def cyclic_reads():
+    """Reads of a small random genome with cycles, one genome per seed."""
+    return _cyclic_reads
@@ -0,0 +1,72 @@
+import random
+
+import pytest
+
+np = pytest.importorskip("numpy")
+
+from week1.code.csr import CSRDBG
+from week1.code.dbg import DBG
+from week1.code.kmer import decode
+from week1.code.packed import PackedDBG
+
+
+def test_csr_layout():
+    data = ["ATCGGATTACAGATTACCA", "GATTACAGGT", "CCATCGGATT"]
+    k = 4
+    dbg = DBG(k, data)
+    csr = CSRDBG(k, data)
+    assert csr.kmer_count == dbg.kmer_count
+    assert len(csr.offsets) == csr.kmer_count + 1
+    assert len(csr.targets) == sum(len(node.children) for node in dbg.nodes.values())
+    for idx, node in dbg.nodes.items():
+        assert decode(int(csr.kmers[idx]), k) == node.kmer
+        assert csr.counts[idx] == node.count
+        children = csr._get_sorted_children(idx)
+        assert set(children) == node.children
+        assert [csr.counts[c] for c in children] == sorted((csr.counts[c] for c in children), reverse=True)
+    # a few dozen bytes per node instead of a Node object with a set
+    assert csr.nbytes() / csr.kmer_count < 64
+
+
+def test_csr_get_longest_contig():
+    data = ["ATCGGATTACAGCTTACCA", "TTGACCGTAAC"]
+    dbg = DBG(5, data)
+    csr = CSRDBG(5, data)
+    while True:
+        contig = dbg.get_longest_contig()
+        assert csr.get_longest_contig() == contig
+        if contig is None:
+            break
+    assert not csr.alive.any()
+
+
+def test_csr_parents():
+    data = ["ATCGGATTACAGATTACCA", "GATTACAGGT", "CCATCGGATT"]
+    dbg = PackedDBG(4, data)
+    csr = CSRDBG(4, data)
+    for idx, node in dbg.nodes.items():
+        assert csr._get_parents(idx) == sorted(node.parents)
+
+
+def test_csr_parallel_build():
+    data = ["ATCGGATTACAGATTACCA", "GATTACAGGT", "CCATCGGATT", "TTGACCGTAAC", "ACGT" * 6]
+    serial = CSRDBG(5, data)
+    parallel = CSRDBG(5, iter(data), workers=3)
+    for name in ["kmers", "counts", "offsets", "targets", "parents"]:
+        assert np.array_equal(getattr(parallel, name), getattr(serial, name))
+
+
+def test_csr_get_top_contigs(cyclic_reads):
+    rng = random.Random(11)
+    genome = "".join(rng.choice("ACGT") for _ in range(400))
+    datasets = [[genome[i: i + 60] for i in range(0, 340, 7)] + ["ACGTTGCA" * 4]]
+    datasets += [[read for seed in [0, 4, 8, 10] for read in cyclic_reads(seed)], cyclic_reads(21)]
+    for data in datasets:
+        repeated = PackedDBG(5, data)
+        expected = [repeated.get_longest_contig() for _ in range(12)]
+        expected = [contig for contig in expected if contig is not None]
+        assert CSRDBG(5, data).get_top_contigs(12) == expected
+        incremental = CSRDBG(5, data, incremental=True)
+        assert [incremental.get_longest_contig() for _ in range(12)] == [
+            *expected, *[None] * (12 - len(expected))]
+        assert incremental.tracked
@@ -0,0 +1,117 @@
+import importlib
+import os
+import random
+import subprocess
+import sys
+
+import pytest
+
+np = pytest.importorskip("numpy")
+
+from week1.code.csr import CSRDBG
+from week1.code.packed import PackedDBG
+from week1.code.external import minimizer_buckets
+from week1.code.kmer import encode_read, reverse_complement_code
+
+
+def _data():
+    rng = random.Random(3)
+    genome = "".join(rng.choice("ACGT") for _ in range(400))
+    return [genome[i: i + 60] for i in range(0, 340, 7)] + ["ACGTACGTACGT", "AAAAAAAAAAAAAAAA", "ACG"]
+
+
+def _graph(dbg):
+    return [(idx, node.kmer, node.count, list(node.children), sorted(node.parents))
+            for idx, node in dbg.nodes.items()]
+
+
+def test_minimizer_buckets():
+    read = "ACGGTACCTTAGCATGCAAGTC"
+    k = 9
+    fwd, rev = encode_read(read, k)
+    buckets = minimizer_buckets(read, k, 5, 16)
+    assert len(buckets) == len(fwd)
+    assert all(0 <= b < 16 for b in buckets)
+    # a k-mer and its reverse complement share a bucket
+    assert buckets[::-1] == minimizer_buckets(read[::-1].translate(str.maketrans("ACGT", "TGCA")), k, 5, 16)
+    assert [reverse_complement_code(code, k) for code in fwd] == rev[::-1]
+
+
+def test_build_external():
+    data = _data()
+    serial = PackedDBG(15, data)
+    assert _graph(PackedDBG(15, data, memory_budget=1 << 20)) == _graph(serial)
+    # a budget this small splits the buckets and merges many small files
+    assert _graph(PackedDBG(15, data, memory_budget=1 << 14)) == _graph(serial)
+
+
+def test_build_external_fan_in(monkeypatch):
+    data = _data()
+    serial = PackedDBG(15, data)
+    # DBG imports the module by bare name, so that is the copy to patch
+    external = importlib.import_module("external")
+    monkeypatch.setattr(external, "FAN_IN", 3)
+    opened = []
+    real_open = open
+
+    def counting_open(*args, **kwargs):
+        f = real_open(*args, **kwargs)
+        opened.append(f)
+        assert sum(not g.closed for g in opened) <= 3 + 1
+        return f
+
+    monkeypatch.setattr(external, "open", counting_open, raising=False)
+    # splits recurse, never with more than FAN_IN files open
+    assert _graph(PackedDBG(15, data, memory_budget=1 << 12)) == _graph(serial)
+    assert len(opened) > 30
+    assert PackedDBG(15, data, memory_budget=1 << 20).get_top_contigs(5) == serial.get_top_contigs(5)
+
+
+def test_csr_external():
+    data = _data()
+    csr = CSRDBG(15, data)
+    # small enough to split the buckets
+    external = CSRDBG(15, data, memory_budget=1 << 14)
+    for name in ["kmers", "counts", "offsets", "targets"]:
+        assert np.array_equal(getattr(external, name), getattr(csr, name))
+
+
+# run in a fresh interpreter, so the measure is not inflated by pages a fork copies from pytest
+_GROWTH = """
+import random, re, sys
+from csr import CSRDBG
+
+def status(field):
+    with open('/proc/self/status') as f:
+        return int(re.search(field + r':\\s+(\\d+) kB', f.read()).group(1)) << 10
+
+rng = random.Random(11)
+genome = ''.join(rng.choice('ACGT') for _ in range(60000))
+data = [genome[i: i + 100] for i in range(0, len(genome) - 100, 4)]
+# peak RSS is reset once the reads exist, so only what the build adds is measured
+with open('/proc/self/clear_refs', 'w') as f:
+    f.write('5')
+base = status('VmRSS')
+graph = CSRDBG(25, iter(data), memory_budget=int(sys.argv[1]))
+print(status('VmHWM') - base, graph.kmer_count)
+"""
+
+
+def _peak_growth(budget):
+    code = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "code")
+    out = subprocess.run([sys.executable, "-c", _GROWTH, str(budget)], cwd=code, check=True,
+                         capture_output=True, text=True).stdout
+    growth, kmers = out.split()
+    return int(growth), int(kmers)
+
+
+@pytest.mark.skipif(not os.path.exists("/proc/self/clear_refs"), reason="needs Linux peak RSS reset")
+def test_csr_external_memory():
+    budget = 16 << 20
+    growth, kmers = _peak_growth(budget)
+    # 0 is the in-memory count, which alone takes several times the budget for these 240 000 bases
+    memory_growth, memory_kmers = _peak_growth(0)
+    assert kmers == memory_kmers
+    assert memory_growth > 2 * budget
+    # the finished graph included
+    assert growth < budget
@@ -0,0 +1,31 @@
+from week1.code.kmer import encode, decode, reverse_complement_code, encode_read
+from week1.code.dbg import reverse_complement
+
+
+def test_encode_decode():
+    cases = ["A", "T", "ACGT", "GGATCC", "TTTTTTTTTTTTTTTTTTTTTTTTTTTTTTTT"]
+    for kmer in cases:
+        assert decode(encode(kmer), len(kmer)) == kmer
+    assert encode("ACGT") == 0b00011011
+    # bytes input uses the same table
+    assert encode(b"ACGT") == encode("ACGT")
+
+
+def test_reverse_complement_code():
+    cases = ["A", "AT", "AG", "ATCG", "AAAACCCGGT", "ACGTTGCAACGTTGCAACGTTGCAACGTTGCA"]
+    for kmer in cases:
+        k = len(kmer)
+        assert decode(reverse_complement_code(encode(kmer), k), k) == reverse_complement(kmer)
+
+
+def test_encode_read():
+    read = "ATCGGATTACA"
+    k = 4
+    fwd, rev = encode_read(read, k)
+    rc = reverse_complement(read)
+    assert [decode(c, k) for c in fwd] == [read[i: i + k] for i in range(len(read) - k + 1)]
+    assert [decode(c, k) for c in rev] == [rc[i: i + k] for i in range(len(rc) - k + 1)]
+    assert encode_read("ATC", k) == ([], [])
+    # bytes-like reads encode the same as str
+    assert encode_read(memoryview(read.encode()), k) == (fwd, rev)
+    assert encode_read(read.encode(), k) == (fwd, rev)
@@ -0,0 +1,9 @@
+from week1.code.main import K, read_data
+
+
+def test_read_data(tmp_path):
+    clean = "ACGT" * 10
+    (tmp_path / "short_1.fasta").write_text(f">r0\n{clean}\r\n>r1\n{'A' * K}N{'C' * (K - 1)}\n")
+    (tmp_path / "short_2.fasta").write_text(f">r2\n{'G' * (K + 3)}n{'t' * K}\n\n")
+    # no long.fasta, as in data4; lowercase bases are kept, upper-cased
+    assert read_data(str(tmp_path)) == [clean, "A" * K, "G" * (K + 3), "T" * K]
@@ -0,0 +1,51 @@
+import pytest
+
+from week1.code.packed import PackedDBG
+from week1.code.kmer import encode
+from week1.code.mask import MaskDBG
+
+
+def test_mask_adjacency():
+    data = ["ATCGGATTACAGATTACCA", "GATTACAGGT", "CCATCGGATT"]
+    k = 4
+    dbg = PackedDBG(k, data)
+    mask = MaskDBG(k, data, multiplicity=True)
+    assert mask.kmer_count == dbg.kmer_count
+    for idx, node in dbg.nodes.items():
+        assert mask.nodes[idx].kmer == node.kmer
+        assert mask.nodes[idx].count == node.count
+        assert set(mask._get_sorted_children(idx)) == node.children
+        assert bin(mask.nodes[idx].pred).count('1') == len(node.parents)
+    # GATTA occurs twice in the first read and once in the second
+    gatt = mask.kmer2idx[encode("GATT")]
+    atta = mask.kmer2idx[encode("ATTA")]
+    assert mask.get_multiplicity(gatt, atta) == 3
+    assert mask.get_multiplicity(atta, gatt) == 0
+
+
+@pytest.mark.parametrize("incremental", [False, True])
+def test_mask_get_longest_contig(incremental):
+    data = ["ATCGGATTACAGCTTACCA", "TTGACCGTAAC"]
+    dbg = PackedDBG(5, data)
+    mask = MaskDBG(5, data, incremental=incremental)
+    while True:
+        contig = dbg.get_longest_contig()
+        assert mask.get_longest_contig() == contig
+        if contig is None:
+            break
+    assert len(mask.nodes) == 0
+
+
+def test_mask_multiplicity_needs_serial_build():
+    with pytest.raises(AssertionError):
+        MaskDBG(4, ["ATCGGATTACA"], multiplicity=True, workers=2)
+
+
+def test_mask_incremental_cycles(cyclic_reads):
+    # cycles, where incremental depths must still match a full pass
+    for seed in range(12):
+        data = cyclic_reads(seed)
+        full = MaskDBG(5, data)
+        mask = MaskDBG(5, data, incremental=True)
+        for _ in range(8):
+            assert mask.get_longest_contig() == full.get_longest_contig()
@@ -0,0 +1,45 @@
+import json
+
+from week1.code.packed import PackedDBG
+from week1.code.profiler import Profiler
+
+DATA = ["ATCGGATTACAGCTTACCA", "TTGACCGTAAC", "GATTACAGGT"]
+
+
+def test_profiler_phases(tmp_path):
+    profiler = Profiler()
+    dbg = PackedDBG(5, DATA, incremental=True, profiler=profiler)
+    nodes = len(dbg.nodes)
+    while dbg.get_longest_contig() is not None:
+        pass
+    report = profiler.report()
+    names = [record["phase"] for record in report["phases"]]
+    assert names[0] == "build"
+    assert names[1:4] == ["longest_path", "concat_path", "delete_path"]
+    assert all(record["contig"] == i // 3 for i, record in enumerate(report["phases"][1:]))
+    assert report["counters"]["nodes_deleted"] == nodes
+    assert report["counters"]["nodes_visited"] >= nodes
+    assert report["high_water"]["stack"] >= 1
+    assert sum(contig["nodes"] for contig in report["contigs"]) == nodes
+    assert report["phases"][1]["counters"]["nodes_visited"] == nodes
+
+    path = str(tmp_path / "report.json")
+    profiler.dump(path)
+    with open(path) as f:
+        assert json.load(f)["counters"] == report["counters"]
+
+
+def test_profiler_reset_and_memory():
+    profiler = Profiler(trace_memory=True)
+    dbg = PackedDBG(5, DATA, profiler=profiler)
+    dbg.get_longest_contig()
+    profiler.stop()
+    names = [record["phase"] for record in profiler.phases]
+    assert names == ["build", "reset", "longest_path", "concat_path", "delete_path"]
+    assert all(record["traced_peak_mb"] > 0 for record in profiler.phases)
+
+
+def test_profiler_off():
+    dbg = PackedDBG(5, DATA)
+    assert dbg.profiler is None
+    assert dbg.get_longest_contig() is not None
@@ -0,0 +1,32 @@
+from week1.code.packed import PackedDBG
+from week1.code.revcomp import clean_reads, reverse_complement, reverse_complement_batch
+
+
+def test_reverse_complement_ambiguous():
+    assert reverse_complement("ACGTN") == "NACGT"
+    assert reverse_complement("acgg") == "CCGT"
+    assert reverse_complement(b"AACR") == b"NGTT"
+    assert reverse_complement(memoryview(b"GATTACA")) == b"TGTAATC"
+
+
+def test_reverse_complement_batch():
+    reads = ["ATCG", "GGATTN", "", "a"]
+    assert reverse_complement_batch(reads) == [reverse_complement(read) for read in reads]
+    views = [memoryview(b"ACCT"), memoryview(b"TTTG")]
+    assert reverse_complement_batch(views) == [b"AGGT", b"CAAA"]
+    assert reverse_complement_batch([]) == []
+
+
+def test_clean_reads():
+    reads = ["ACGTNNacgtta", "GGNC", "ACGTAC"]
+    assert list(clean_reads(reads, 3)) == ["ACGT", "ACGTTA", "ACGTAC"]
+    # batches are cleaned independently
+    assert list(clean_reads(reads, 3, batch_size=1)) == ["ACGT", "ACGTTA", "ACGTAC"]
+    assert list(clean_reads([b"AC-GTT", b"YYY"], 2)) == [b"AC", b"GTT"]
+    # clean reads pass through as the same objects
+    views = [memoryview(b"ACGT"), memoryview(b"GGTA")]
+    assert all(a is b for a, b in zip(clean_reads(views, 4), views))
+
+    # a read with an N used to stop the packed build with a KeyError
+    dbg = PackedDBG(3, clean_reads(["ACGTNACGGA", "acgtacgg"], 3))
+    assert dbg.kmer_count == PackedDBG(3, ["ACGT", "ACGGA", "ACGTACGG"]).kmer_count
@@ -0,0 +1,18 @@
+from week1.code.scc import strongly_connected_components
+
+
+def test_scc_components():
+    graph = {0: [1], 1: [2], 2: [0, 3], 3: [4], 4: [3, 5], 5: []}
+    components, index = strongly_connected_components(graph.keys(), lambda v: graph[v])
+    assert [sorted(c) for c in components] == [[5], [3, 4], [0, 1, 2]]
+    # each component lists its vertices in decreasing discovery order
+    for component in components:
+        assert [index[v] for v in component] == sorted((index[v] for v in component), reverse=True)
+    assert sorted(index) == list(graph)
+
+
+def test_scc_deep_chain():
+    n = 200000  # far deeper than the recursion limit
+    components, _ = strongly_connected_components(range(n), lambda v: [v + 1] if v + 1 < n else [])
+    assert len(components) == n
+    assert components[0] == [n - 1]
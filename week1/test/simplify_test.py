@@ -0,0 +1,56 @@
+from week1.code.dbg import DBG
+from week1.code.packed import PackedDBG
+from week1.code.simplify import clip_tips, pop_bubbles, remove_low_coverage
+
+# no k-mer of length 4 or 5 repeats or meets its own reverse complement
+MAIN = "TTAGTTGTGCCGCAGCGAAGTAG"
+
+
+def _kmers(dbg):
+    return {dbg.nodes[idx].kmer for idx in dbg.nodes}
+
+
+def _spectrum(seq, k):
+    return {seq[i: i + k] for i in range(len(seq) - k + 1)}
+
+
+def test_clip_tips():
+    # an error near the end of one read branches off for three k-mers
+    tip = MAIN[:12] + "AAA"
+    dbg = DBG(5, [MAIN, MAIN, tip])
+    assert clip_tips(dbg, 10) == 6  # the tip and its reverse complement
+    kmers = _kmers(dbg)
+    assert not kmers & (_spectrum(tip, 5) - _spectrum(MAIN, 5))
+    assert _spectrum(MAIN, 5) <= kmers
+
+
+def test_clip_tips_keeps_isolated_chains():
+    dbg = DBG(5, [MAIN])
+    assert clip_tips(dbg, 100) == 0
+
+
+def test_pop_bubbles():
+    snp = MAIN[:11] + "A" + MAIN[12:]
+    dbg = DBG(5, [MAIN, MAIN, MAIN, snp])
+    assert pop_bubbles(dbg, 10) == 10  # five k-mers per strand cover the variant
+    kmers = _kmers(dbg)
+    assert _spectrum(MAIN, 5) <= kmers
+    assert not kmers & (_spectrum(snp, 5) - _spectrum(MAIN, 5))
+    assert dbg.get_longest_contig() == MAIN
+
+
+def test_remove_low_coverage():
+    dbg = DBG(4, [MAIN, MAIN, MAIN[:8] + "CCCA"])
+    assert remove_low_coverage(dbg, 3) > 0
+    for node in dbg.nodes.values():
+        for child in node.children:
+            assert min(node.count, dbg.nodes[child].count) >= 3
+    assert all(node.children or node.parents or node.count >= 3 for node in dbg.nodes.values())
+
+
+def test_dbg_simplify():
+    snp = MAIN[:11] + "A" + MAIN[12:]
+    data = [MAIN, MAIN, MAIN, snp, MAIN[:14] + "AAA"]
+    dbg = PackedDBG(5, data, simplify=True, tip_length=10, bubble_length=10)
+    assert len(dbg.nodes) == 2 * (len(MAIN) - 4)
+    assert dbg.get_longest_contig() == MAIN
@@ -0,0 +1,53 @@
+import pytest
+
+np = pytest.importorskip("numpy")
+
+from week1.code.csr import CSRDBG
+from week1.code.packed import PackedDBG
+from week1.code.snapshot import load_snapshot, save_snapshot, snapshot_key
+
+DATA = ["ATCGGATTACAGCTTACCA", "TTGACCGTAAC", "GATTACAGGT"]
+
+
+def test_snapshot_round_trip(tmp_path):
+    path = str(tmp_path / "graph.snap")
+    csr = CSRDBG(5, DATA)
+    save_snapshot(csr, path, "key")
+    loaded = load_snapshot(path, "key")
+    assert isinstance(loaded.kmers, np.memmap)
+    assert isinstance(loaded.parents, np.memmap)
+    for name in ["kmers", "counts", "offsets", "targets", "parent_offsets", "parents"]:
+        assert np.array_equal(getattr(loaded, name), getattr(csr, name))
+    while True:
+        contig = csr.get_longest_contig()
+        assert loaded.get_longest_contig() == contig
+        if contig is None:
+            break
+
+    # the warm start extracts the same top contigs as a fresh build
+    assert load_snapshot(path, "key").get_top_contigs(5) == CSRDBG(5, DATA).get_top_contigs(5)
+
+
+def test_snapshot_from_nodes(tmp_path):
+    path = str(tmp_path / "graph.snap")
+    dbg = PackedDBG(5, DATA)
+    save_snapshot(dbg, path, "key")
+    loaded = load_snapshot(path)
+    csr = CSRDBG(5, DATA)
+    assert loaded.k == 5
+    for name in ["kmers", "counts", "offsets", "targets", "parent_offsets", "parents"]:
+        assert np.array_equal(getattr(loaded, name), getattr(csr, name))
+
+
+def test_snapshot_key(tmp_path):
+    reads = tmp_path / "short_1.fasta"
+    reads.write_text(">r\nATCGGATTACA\n")
+    key = snapshot_key([str(reads)], 5)
+    assert snapshot_key([str(reads)], 5) == key
+    assert snapshot_key([str(reads)], 7) != key
+
+    path = str(tmp_path / "graph.snap")
+    save_snapshot(CSRDBG(5, ["ATCGGATTACA"]), path, key)
+    reads.write_text(">r\nATCGGATTACC\n")
+    assert load_snapshot(path, snapshot_key([str(reads)], 5)) is None
+    assert load_snapshot(str(tmp_path / "missing.snap"), key) is None
@@ -0,0 +1,79 @@
+import json
+import math
+import os
+
+import pytest
+
+np = pytest.importorskip("numpy")
+
+from week1.code.csr import CSRDBG
+from week1.code.packed import PackedDBG
+from week1.code.revcomp import clean_reads
+from week1.code.spectrum import (apply_cutoff, coverage_cutoff, export_json, graph_counts, histogram, peak,
+                                 valley)
+from week1.code.utils import map_data
+
+SOLID = "TTAGTTGTGCCGCAGCGAAGTAG"
+
+
+def test_coverage_cutoff():
+    # error k-mers at counts 1-2, solid ones around 10, with the even/odd alternation of DBG counts
+    hist = np.array([0, 400, 9000, 30, 500, 60, 800, 90, 1200, 80, 1500, 70, 1100, 40, 300])
+    assert valley(hist) == (5, 10)
+    assert peak(hist, 3) == 10
+    # at 5 occurrences per k-mer, cutting any k-mer seen inside a read would drop solid ones
+    assert coverage_cutoff(hist) == 2
+    # a spectrum without errors is not cut
+    assert coverage_cutoff(np.array([0, 0, 5, 10, 50, 20, 3])) == 1
+    assert coverage_cutoff(np.array([0, 100, 50, 10, 1])) == 1
+
+
+def test_coverage_cutoff_noise():
+    # solid k-mers at 30 occurrences, errors falling off from count 2, and a bump at 8 after a dip at 6
+    hist = np.zeros(100, dtype=np.int64)
+    for x in range(1, 50):
+        hist[2 * x] += round(50000 * math.exp(-30) * 30 ** x / math.factorial(x))
+    for x in range(1, 8):
+        hist[2 * x] += round(90000 * 0.2 ** (x - 1))
+    hist[1::2] += hist[0:-1:2] // 10
+    hist[8] += 200
+    low, top = valley(hist)
+    assert 8 < low < top and top == 58
+    # the tail of a peak this high is thin, so the cut stays close to the valley
+    assert 8 < coverage_cutoff(hist) <= low
+
+
+def test_coverage_cutoff_data2():
+    reads = clean_reads(map_data(os.path.join(os.path.dirname(__file__), "..", "data", "data2")), 25)
+    hist = histogram(graph_counts(CSRDBG(25, reads)))
+    # the paired counts dip at 5-6, rise at 7-8 and only bottom out at 9-12, well before the peak at 28
+    assert valley(hist) == (11, 28)
+    # data2 loses contigs to any cut above 2: the thick tail of its solid peak reaches the valley
+    assert coverage_cutoff(hist) == 2
+
+
+def test_graph_spectrum(tmp_path):
+    data = [SOLID] * 4 + ["GGCATCCATGAC"]
+    dbg = PackedDBG(5, data)
+    hist = histogram(graph_counts(dbg))
+    assert hist.sum() == len(dbg.nodes)
+    assert hist[8] == 2 * (len(SOLID) - 6)
+
+    path = str(tmp_path / "spectrum.json")
+    export_json(hist, path, k=5, cutoff=3)
+    with open(path) as f:
+        report = json.load(f)
+    assert report["histogram"] == hist.tolist()
+    assert report["k"] == 5 and report["cutoff"] == 3 and report["peak"] == 8
+    assert report["solid_kmers"] == 2 * (len(SOLID) - 4)
+
+    assert apply_cutoff(dbg, 3) == 3
+    assert len(dbg.nodes) == 2 * (len(SOLID) - 4)
+    assert dbg.get_longest_contig() == SOLID
+
+
+def test_csr_cutoff():
+    csr = CSRDBG(5, [SOLID] * 4 + ["GGCATCCATGAC"])
+    assert apply_cutoff(csr, 3) == 3
+    assert csr.alive.sum() == 2 * (len(SOLID) - 4)
+    assert histogram(graph_counts(csr))[:3].sum() == 0
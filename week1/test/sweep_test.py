@@ -0,0 +1,19 @@
+from week1.code.packed import PackedDBG
+from week1.code.sweep import best, sweep
+
+DATA = ["ATCGGATTACAGCTTACCA", "TTGACCGTAAC", "GATTACAGGT"]
+
+
+def test_sweep():
+    results = sweep(iter(DATA), [4, 6, 5], 2, contigs=3)
+    assert [result["k"] for result in results] == [4, 6, 5]
+    for result in results:
+        dbg = PackedDBG(result["k"], DATA, incremental=True)
+        assert result["contigs"] == [dbg.get_longest_contig() for _ in range(len(result["contigs"]))]
+        assert 0 < len(result["contigs"]) <= 3
+        assert result["peak_mb"] >= 0 and result["time"] >= result["build_time"]
+
+
+def test_best():
+    results = [{"k": 31, "n50": 90}, {"k": 21, "n50": 120}, {"k": 25, "n50": 120}]
+    assert best(results)["k"] == 21
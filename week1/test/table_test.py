@@ -0,0 +1,66 @@
+import random
+
+from week1.code.dbg import DBG
+from week1.code.kmer import decode
+from week1.code.packed import PackedDBG
+from week1.code.table import KmerTable, TableDBG
+
+
+def test_kmer_table():
+    table = KmerTable(capacity=4)
+    for key in range(100):
+        assert table.add(key * 7, key & 3) == key
+    assert table.add(0) == 0
+    assert len(table) == 100
+    assert len(table.keys) >= 100 / 0.7
+    assert table.count(0) == 2 and table.count(7) == 1
+    assert table.successors(7) == 0b0010
+    assert table.get(5) == -1
+    assert sorted(entry[1] for entry in table) == list(range(100))
+
+    # a full count stays full rather than carrying into the node id
+    full = (1 << 28) - 1
+    table.values[table._slot(7)] |= full << 4
+    assert table.add(7, 0) == 1
+    assert table.count(7) == full and table.get(7) == 1 and table.successors(7) == 0b0011
+
+
+def test_table_dbg_layout():
+    data = ["ATCGGATTACAGATTACCA", "GATTACAGGT", "CCATCGGATT"]
+    k = 4
+    dbg = DBG(k, data)
+    table = TableDBG(k, data)
+    assert table.kmer_count == dbg.kmer_count
+    for idx, node in dbg.nodes.items():
+        assert decode(table.kmers[idx], k) == node.kmer
+        assert table._get_count(idx) == node.count
+        assert set(table._get_sorted_children(idx)) == node.children
+        assert table._get_parents(idx) == sorted(node.parents)
+
+
+def test_table_dbg_get_longest_contig():
+    data = ["ATCGGATTACAGCTTACCA", "TTGACCGTAAC"]
+    dbg = DBG(5, data)
+    table = TableDBG(5, data)
+    while True:
+        contig = dbg.get_longest_contig()
+        assert table.get_longest_contig() == contig
+        if contig is None:
+            break
+    assert not any(table.alive)
+
+
+def test_table_dbg_get_top_contigs(cyclic_reads):
+    rng = random.Random(11)
+    genome = "".join(rng.choice("ACGT") for _ in range(400))
+    datasets = [[genome[i: i + 60] for i in range(0, 340, 7)] + ["ACGTTGCA" * 4]]
+    datasets += [[read for seed in [0, 4, 8, 10] for read in cyclic_reads(seed)], cyclic_reads(21)]
+    for data in datasets:
+        repeated = PackedDBG(5, data)
+        expected = [repeated.get_longest_contig() for _ in range(12)]
+        expected = [contig for contig in expected if contig is not None]
+        assert TableDBG(5, data).get_top_contigs(12) == expected
+        incremental = TableDBG(5, data, incremental=True)
+        assert [incremental.get_longest_contig() for _ in range(12)] == [
+            *expected, *[None] * (12 - len(expected))]
+        assert incremental.tracked
@@ -0,0 +1,71 @@
+import gzip
+
+from week1.code.utils import ReadBuffer, iter_reads, map_data, read_data
+from week1.code.dbg import DBG
+from week1.code.packed import PackedDBG
+
+
+def test_iter_reads_fasta(tmp_path):
+    path = tmp_path / "reads.fasta"
+    path.write_text(">r0\nACGT\nTTGA\n\n>r1 second\nGGCC\n>r2\nA\nC\nG\n")
+    reads = iter_reads(str(path))
+    assert next(reads) == "ACGTTTGA"  # records are yielded lazily
+    assert list(reads) == ["GGCC", "ACG"]
+
+
+def test_iter_reads_fastq_gzip(tmp_path):
+    text = "@r0\nACGT\n+\n@@II\n@r1\nGGCC\nAA\n+r1\nIIII\n@@\n"
+    plain = tmp_path / "reads.fq"
+    plain.write_text(text)
+    packed = tmp_path / "reads.fq.gz"
+    with gzip.open(packed, "wt") as f:
+        f.write(text)
+    # a quality line starting with '@' is not mistaken for a header
+    assert list(iter_reads(str(plain))) == ["ACGT", "GGCCAA"]
+    assert list(iter_reads(str(packed))) == ["ACGT", "GGCCAA"]
+
+
+def test_read_data(tmp_path):
+    (tmp_path / "short_1.fasta").write_text(">a\nACGTA\n")
+    with gzip.open(tmp_path / "short_2.fasta.gz", "wt") as f:
+        f.write(">b\nCCGTA\n")
+    # long.fasta is missing, as in data4
+    reads = read_data(str(tmp_path))
+    assert list(reads) == ["ACGTA", "CCGTA"]
+
+    # DBG takes the stream directly
+    dbg = DBG(3, read_data(str(tmp_path)))
+    assert dbg.get_longest_contig() is not None
+    assert len(DBG(3, iter(["ACGTA", "CCGTA"])).nodes) == len(DBG(3, ["ACGTA", "CCGTA"]).nodes)
+
+
+def test_read_buffer(tmp_path):
+    single = tmp_path / "single.fasta"
+    single.write_text(">r0\nACGT\n>r1\nGGCCA\n")
+    buffer = ReadBuffer(str(single))
+    assert len(buffer) == 2
+    # single-line records are views straight into the mapped file
+    assert isinstance(buffer[1], memoryview) and buffer[1].obj is buffer.data.obj
+    assert [bytes(read) for read in buffer] == [b"ACGT", b"GGCCA"]
+
+    # multi-line, FASTQ and gzip input parse as iter_reads does
+    multi = tmp_path / "multi.fasta"
+    multi.write_text(">r0\nACGT\nTTGA\n\n>empty\n>r1 second\nGGCC\n")
+    fastq = tmp_path / "reads.fq.gz"
+    with gzip.open(fastq, "wt") as f:
+        f.write("@r0\nACGT\n+\n@@II\n@r1\nGGCC\nAA\n+r1\nIIII\n@@\n")
+    empty = tmp_path / "empty.fasta"
+    empty.write_text("")
+    for path in [multi, fastq, empty]:
+        assert [bytes(read).decode() for read in ReadBuffer(str(path))] == list(iter_reads(str(path)))
+
+
+def test_map_data(tmp_path):
+    (tmp_path / "short_1.fasta").write_text(">a\nACGTA\n>b\nTTACG\n")
+    with gzip.open(tmp_path / "short_2.fasta.gz", "wt") as f:
+        f.write(">c\nCCGTA\n")
+    assert [bytes(read) for read in map_data(str(tmp_path))] == [b"ACGTA", b"TTACG", b"CCGTA"]
+    dbg = PackedDBG(3, map_data(str(tmp_path)))
+    expected = PackedDBG(3, read_data(str(tmp_path)))
+    assert [(node.kmer, node.count, list(node.children)) for node in dbg.nodes.values()] == \
+        [(node.kmer, node.count, list(node.children)) for node in expected.nodes.values()]